@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for leetcode_tracker.
+
+Gunicorn loads ./gunicorn.conf.py automatically, so the Procfile and
+render.yaml start commands pick this up without extra flags.
+
+ASGI deployment (async views, one worker holds many upstream waits):
+    TRACKER_ASYNC_VIEWS=True gunicorn leetcode_tracker.asgi -k uvicorn.workers.UvicornWorker
+"""
+
+
+def worker_exit(server, worker):
+    """Flush buffered view counts and close the upstream HTTP pool when a worker shuts down."""
+    try:
+        from tracker.counters import view_counter
+        view_counter.shutdown()
+    except Exception:
+        pass
+    try:
+        from tracker.http_client import shared_client
+        shared_client.shutdown()
+    except Exception:
+        pass
@@ -14,3 +14,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leetcode_tracker.settings')
 
 application = get_asgi_application()
+
+# With async views enabled the (sync-only) WhiteNoise middleware is left out,
+# so serve collected static files from the ASGI application itself.
+from django.conf import settings  # noqa: E402
+
+if settings.TRACKER_ASYNC_VIEWS:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
@@ -53,7 +53,15 @@ try:
 except Exception:
     _WHITENOISE_AVAILABLE = False
 
-if _WHITENOISE_AVAILABLE:
+# Serve the upstream-bound views (profile, profiles, api_user_data,
+# api_user_data_multi) as async views. Enable this when running under ASGI:
+#   gunicorn leetcode_tracker.asgi -k uvicorn.workers.UvicornWorker
+TRACKER_ASYNC_VIEWS = os.environ.get('TRACKER_ASYNC_VIEWS', 'False') == 'True'
+
+# WhiteNoise's middleware is sync-only and would force every async request
+# through a worker thread, so under ASGI static files are served by the
+# ASGI application wrapper instead (see asgi.py).
+if _WHITENOISE_AVAILABLE and not TRACKER_ASYNC_VIEWS:
     # Insert WhiteNoise right after SecurityMiddleware (index 1)
     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
@@ -101,6 +109,113 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Cache
+# A shared backend (Redis) is used when REDIS_URL is set and redis-py is
+# installed; otherwise each worker keeps its own in-memory cache.
+_REDIS_AVAILABLE = False
+try:
+    if os.environ.get('REDIS_URL') and importlib.util.find_spec('redis'):
+        _REDIS_AVAILABLE = True
+except Exception:
+    _REDIS_AVAILABLE = False
+
+if _REDIS_AVAILABLE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'leetcode-tracker',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Whole-page cache for anonymous home/leaderboard requests (seconds; 0
+# disables). Pages are invalidated when tracked users change, but with the
+# per-process fallback cache other processes (e.g. the refresh worker)
+# cannot reach it, so the default is short there.
+PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', '3600' if _REDIS_AVAILABLE else '30'))
+
+# Stats cache (seconds). Entries younger than STATS_CACHE_TTL are served
+# as-is; older entries are served immediately while a background refresh
+# runs, until they exceed STATS_CACHE_STALE_TTL.
+STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', '300'))
+STATS_CACHE_STALE_TTL = int(os.environ.get('STATS_CACHE_STALE_TTL', '86400'))
+STATS_CACHE_MAX_ENTRIES = int(os.environ.get('STATS_CACHE_MAX_ENTRIES', '1000'))
+
+# Render profile pages of already-tracked users from the cache/database
+# without waiting on upstream; the page refreshes itself when data is stale.
+PROFILE_RENDER_FROM_DB = os.environ.get('PROFILE_RENDER_FROM_DB', 'True') == 'True'
+
+# Submission history retention (0 disables the limit)
+SUBMISSION_RETENTION_DAYS = int(os.environ.get('SUBMISSION_RETENTION_DAYS', '365'))
+SUBMISSION_MAX_PER_USER = int(os.environ.get('SUBMISSION_MAX_PER_USER', '1000'))
+
+# Home page: cards per page (more load on scroll), or stream every card
+HOME_PAGE_SIZE = int(os.environ.get('HOME_PAGE_SIZE', '24'))
+HOME_STREAMING = os.environ.get('HOME_STREAMING', 'False') == 'True'
+
+# api_users_list: largest page (also used for limit=all) and how long the
+# total user count is cached
+USERS_LIST_MAX_PAGE = int(os.environ.get('USERS_LIST_MAX_PAGE', '500'))
+USERS_COUNT_CACHE_TTL = int(os.environ.get('USERS_COUNT_CACHE_TTL', '60'))
+
+# In-memory rank index: seconds between incremental syncs from the
+# database and between full rebuilds in a background thread (which also
+# drop deleted users)
+RANK_INDEX_SYNC_INTERVAL = int(os.environ.get('RANK_INDEX_SYNC_INTERVAL', '5'))
+RANK_INDEX_REBUILD_INTERVAL = int(os.environ.get('RANK_INDEX_REBUILD_INTERVAL', '600'))
+
+# Stats history: days raw snapshots are kept before being folded into
+# daily rows, and days daily rows are kept before becoming weekly rows
+SNAPSHOT_RAW_DAYS = int(os.environ.get('SNAPSHOT_RAW_DAYS', '7'))
+SNAPSHOT_DAILY_DAYS = int(os.environ.get('SNAPSHOT_DAILY_DAYS', '90'))
+
+# Users per day matrix in the batch streak/activity engine
+ACTIVITY_BATCH_SIZE = int(os.environ.get('ACTIVITY_BATCH_SIZE', '5000'))
+
+# Seconds between bulk flushes of buffered profile view counts (0 = write
+# every view immediately)
+VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL', '10'))
+
+# Concurrent fetches of one username always share a single upstream call
+# within a worker. With STATS_SINGLE_FLIGHT_SHARED (and a shared cache
+# backend) workers also coordinate through a cache lock, waiting up to
+# STATS_SINGLE_FLIGHT_WAIT seconds for the lock holder's result.
+STATS_SINGLE_FLIGHT_SHARED = os.environ.get('STATS_SINGLE_FLIGHT_SHARED', 'False') == 'True'
+STATS_SINGLE_FLIGHT_WAIT = int(os.environ.get('STATS_SINGLE_FLIGHT_WAIT', '10'))
+STATS_SINGLE_FLIGHT_LOCK_TTL = int(os.environ.get('STATS_SINGLE_FLIGHT_LOCK_TTL', '60'))
+
+# Raw upstream response cache (seconds), per endpoint kind. Stats refreshes
+# (stale pages, background and scheduled refreshes) only refetch the kinds
+# whose entry has expired; /api/user/<name>/?refresh=force refetches all.
+RAW_PROFILE_CACHE_TTL = int(os.environ.get('RAW_PROFILE_CACHE_TTL', '600'))
+RAW_SUBMISSIONS_CACHE_TTL = int(os.environ.get('RAW_SUBMISSIONS_CACHE_TTL', '120'))
+RAW_CONTEST_CACHE_TTL = int(os.environ.get('RAW_CONTEST_CACHE_TTL', '86400'))
+
+# Upstream HTTP pool (one keep-alive session per worker process)
+UPSTREAM_TIMEOUT = int(os.environ.get('UPSTREAM_TIMEOUT', '30'))
+UPSTREAM_POOL_LIMIT = int(os.environ.get('UPSTREAM_POOL_LIMIT', '100'))
+UPSTREAM_POOL_LIMIT_PER_HOST = int(os.environ.get('UPSTREAM_POOL_LIMIT_PER_HOST', '20'))
+UPSTREAM_DNS_CACHE_TTL = int(os.environ.get('UPSTREAM_DNS_CACHE_TTL', '300'))
+UPSTREAM_KEEPALIVE_TIMEOUT = int(os.environ.get('UPSTREAM_KEEPALIVE_TIMEOUT', '60'))
+
+# Race all fallback endpoints of each fetch phase instead of trying them in order
+UPSTREAM_HEDGED_FETCH = os.environ.get('UPSTREAM_HEDGED_FETCH', 'False') == 'True'
+
+# Per-host rate limiting and circuit breaking for the upstream APIs. State is
+# shared by every worker on the node through files in UPSTREAM_STATE_DIR.
+UPSTREAM_RATE_LIMIT = float(os.environ.get('UPSTREAM_RATE_LIMIT', '10'))  # requests/second
+UPSTREAM_RATE_BURST = float(os.environ.get('UPSTREAM_RATE_BURST', '20'))
+UPSTREAM_BREAKER_THRESHOLD = int(os.environ.get('UPSTREAM_BREAKER_THRESHOLD', '5'))
+UPSTREAM_BREAKER_COOLDOWN = int(os.environ.get('UPSTREAM_BREAKER_COOLDOWN', '60'))
+UPSTREAM_STATE_DIR = os.environ.get('UPSTREAM_STATE_DIR', '')
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
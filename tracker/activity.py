@@ -0,0 +1,74 @@
+"""
+Helpers for LeetCode submission calendars.
+
+A submissionCalendar maps the UTC-midnight timestamp of each active day
+(as a string, sometimes in milliseconds, sometimes JSON-encoded as a whole)
+to that day's submission count. Days are handled as integer UTC day
+numbers (days since the Unix epoch).
+"""
+import json
+import time
+
+SECONDS_PER_DAY = 86400
+
+
+def today_day(tz_offset: int = 0) -> int:
+    """Current day number, in UTC shifted by tz_offset seconds"""
+    return (int(time.time()) + tz_offset) // SECONDS_PER_DAY
+
+
+def parse_calendar(submission_calendar, tz_offset: int = 0) -> dict:
+    """Return {day number: submission count} for a raw submissionCalendar.
+
+    tz_offset (seconds east of UTC) buckets days by the user's local
+    midnight instead of UTC.
+    """
+    if not submission_calendar:
+        return {}
+    if isinstance(submission_calendar, str):
+        try:
+            submission_calendar = json.loads(submission_calendar)
+        except ValueError:
+            return {}
+    if not isinstance(submission_calendar, dict):
+        return {}
+
+    days = {}
+    for key, count in submission_calendar.items():
+        try:
+            ts = int(key)
+            if ts > 10**11:
+                ts //= 1000
+            count = int(count)
+        except (ValueError, TypeError):
+            continue
+        if count > 0:
+            day = (ts + tz_offset) // SECONDS_PER_DAY
+            days[day] = days.get(day, 0) + count
+    return days
+
+
+def streaks_from_days(days, today: int) -> tuple:
+    """(current, max) streak for an iterable of active day numbers.
+
+    The current streak counts back from today, or from yesterday when
+    there is no activity yet today. Days after today are ignored.
+    """
+    ordered = sorted(day for day in set(days) if day <= today)
+    if not ordered:
+        return 0, 0
+
+    max_streak = run = 1
+    for previous, day in zip(ordered, ordered[1:]):
+        run = run + 1 if day == previous + 1 else 1
+        if run > max_streak:
+            max_streak = run
+
+    current_streak = run if ordered[-1] >= today - 1 else 0
+    return current_streak, max_streak
+
+
+def calculate_streaks(submission_calendar, tz_offset: int = 0, today=None) -> tuple:
+    """(current, max) streak from a raw submissionCalendar"""
+    today = today_day(tz_offset) if today is None else today
+    return streaks_from_days(parse_calendar(submission_calendar, tz_offset), today)
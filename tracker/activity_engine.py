@@ -0,0 +1,164 @@
+"""
+Batch streak and activity computation for every tracked user.
+
+Stored UserActivity calendars are loaded in chunks into 2-D NumPy day
+matrices (users x days, the last column being today in UTC) and the
+streaks, recent active-day counts and daily population totals are
+computed for a whole chunk at once. refresh_activity() writes the results
+back and rebuilds the streak leaderboard, so streaks that broke at
+midnight UTC show up without refetching each user (see the
+compute_activity management command).
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .activity import today_day
+from .models import LeaderboardEntry, TrackedUser, UserActivity
+
+# Trailing windows (in days) for the active-day counts
+WINDOWS = (7, 30, 365)
+COHORT_DAYS = max(WINDOWS)
+
+
+def _day_matrix(rows, first_day: int, days: int) -> np.ndarray:
+    """uint16 counts for first_day .. first_day + days - 1, one row per (start_day, counts)"""
+    matrix = np.zeros((len(rows), days), dtype=np.uint16)
+    end_day = first_day + days
+    for i, (start_day, counts) in enumerate(rows):
+        values = np.frombuffer(bytes(counts or b''), dtype='<u2')
+        lo, hi = max(start_day, first_day), min(start_day + len(values), end_day)
+        if hi > lo:
+            matrix[i, lo - first_day:hi - first_day] = values[lo - start_day:hi - start_day]
+    return matrix
+
+
+def _trailing_run(active: np.ndarray) -> np.ndarray:
+    """Length of the run of active days ending at the last column, per row"""
+    if active.shape[1] == 0:
+        return np.zeros(active.shape[0], dtype=np.int64)
+    reversed_ = active[:, ::-1]
+    return np.where(reversed_.all(axis=1), active.shape[1], np.argmin(reversed_, axis=1))
+
+
+def _longest_run(active: np.ndarray) -> np.ndarray:
+    """Longest run of active days per row"""
+    rows, days = active.shape
+    padded = np.zeros((rows, days + 2), dtype=np.int8)
+    padded[:, 1:-1] = active
+    edges = np.diff(padded, axis=1)
+    # Every run has one rising and one falling edge, and nonzero() returns
+    # both in row-major order, so they pair up
+    run_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    longest = np.zeros(rows, dtype=np.int64)
+    np.maximum.at(longest, run_rows, ends - starts)
+    return longest
+
+
+def compute_activity(today=None, batch_size=None) -> dict:
+    """Streaks and activity for every stored calendar as of UTC day today.
+
+    Returns {'today', 'users': {user_id: {...}}, 'cohort_submissions',
+    'cohort_active_users'}; the cohort arrays hold the population totals
+    for the last COHORT_DAYS days (oldest first).
+    """
+    today = today_day() if today is None else today
+    batch_size = batch_size or getattr(settings, 'ACTIVITY_BATCH_SIZE', 5000)
+    cohort_submissions = np.zeros(COHORT_DAYS, dtype=np.int64)
+    cohort_active = np.zeros(COHORT_DAYS, dtype=np.int64)
+    users = {}
+
+    def _process(chunk):
+        # Rows without any stored day have nothing to put in the matrix, and
+        # their start_day would stretch it back to the epoch
+        empty = [user_id for user_id, _, counts in chunk if not counts]
+        for user_id in empty:
+            users[user_id] = {'current_streak': 0, 'max_streak': 0, **{f'active_days_{w}': 0 for w in WINDOWS}}
+        chunk = [row for row in chunk if row[2]]
+        if not chunk:
+            return
+
+        first_day = min(min(start_day for _, start_day, _ in chunk), today - COHORT_DAYS + 1)
+        matrix = _day_matrix([(start_day, counts) for _, start_day, counts in chunk], first_day, today - first_day + 1)
+        active = matrix > 0
+
+        current = np.where(active[:, -1], _trailing_run(active), _trailing_run(active[:, :-1]))
+        longest = _longest_run(active)
+        recent = {window: active[:, -window:].sum(axis=1) for window in WINDOWS}
+
+        cohort_submissions[:] += matrix[:, -COHORT_DAYS:].sum(axis=0, dtype=np.int64)
+        cohort_active[:] += active[:, -COHORT_DAYS:].sum(axis=0)
+
+        for i, (user_id, _, _) in enumerate(chunk):
+            users[user_id] = {
+                'current_streak': int(current[i]),
+                'max_streak': int(longest[i]),
+                **{f'active_days_{window}': int(recent[window][i]) for window in WINDOWS},
+            }
+
+    chunk = []
+    rows = UserActivity.objects.values_list('user_id', 'start_day', 'counts').iterator(chunk_size=batch_size)
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= batch_size:
+            _process(chunk)
+            chunk = []
+    if chunk:
+        _process(chunk)
+
+    return {
+        'today': today,
+        'users': users,
+        'cohort_submissions': cohort_submissions,
+        'cohort_active_users': cohort_active,
+    }
+
+
+def refresh_activity(today=None, batch_size=None, dry_run=False) -> dict:
+    """Compute activity for everyone and write back what changed.
+
+    Updates the UserActivity active-day counts and the TrackedUser streaks,
+    then rebuilds the streak leaderboard if any current streak moved.
+    Returns the compute_activity() result plus 'activity_updated' and
+    'users_updated' counts.
+    """
+    result = compute_activity(today, batch_size)
+    computed = result['users']
+    activity_fields = [f'active_days_{window}' for window in WINDOWS]
+
+    changed_activity, changed_users = [], []
+    for activity in UserActivity.objects.only('user_id', *activity_fields).iterator(chunk_size=2000):
+        values = computed.get(activity.user_id)
+        if values and any(getattr(activity, f) != values[f] for f in activity_fields):
+            for f in activity_fields:
+                setattr(activity, f, values[f])
+            changed_activity.append(activity)
+
+    now = timezone.now()
+    streaks_moved = False
+    rows = TrackedUser.objects.filter(pk__in=list(computed)).only('pk', 'current_streak', 'max_streak')
+    for user in rows.iterator(chunk_size=2000):
+        values = computed[user.pk]
+        if (user.current_streak, user.max_streak) != (values['current_streak'], values['max_streak']):
+            streaks_moved = streaks_moved or user.current_streak != values['current_streak']
+            user.current_streak = values['current_streak']
+            user.max_streak = values['max_streak']
+            user.last_updated = now
+            changed_users.append(user)
+
+    if not dry_run:
+        with transaction.atomic():
+            if changed_activity:
+                UserActivity.objects.bulk_update(changed_activity, activity_fields, batch_size=500)
+            if changed_users:
+                TrackedUser.objects.bulk_update(
+                    changed_users, ['current_streak', 'max_streak', 'last_updated'], batch_size=500
+                )
+        if streaks_moved:
+            LeaderboardEntry.rebuild('streak')
+
+    result['activity_updated'] = len(changed_activity)
+    result['users_updated'] = len(changed_users)
+    return result
@@ -1,6 +1,38 @@
 from django.apps import AppConfig
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+
+
+def _invalidate_pages(sender, **kwargs):
+    from .cache import page_cache
+    transaction.on_commit(page_cache.invalidate)
+
+
+def _sync_leaderboards(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .models import LeaderboardEntry
+    LeaderboardEntry.sync_user_or_mark(instance)
+
+
+def _remove_from_leaderboards(sender, instance, **kwargs):
+    from .models import LeaderboardEntry
+    LeaderboardEntry.remove_user(instance)
 
 
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        from .models import TrackedUser
+        from .search import ensure_search_index_after_migrate
+        post_migrate.connect(ensure_search_index_after_migrate, sender=self)
+        # Cached pages show tracked users, so any row change drops them
+        post_save.connect(_invalidate_pages, sender=TrackedUser)
+        post_delete.connect(_invalidate_pages, sender=TrackedUser)
+        # Keep leaderboard ranks in step with rows that update_stats never
+        # sees. Removal runs before the delete cascades to the entries, so
+        # the ranks below them can still be shifted.
+        post_save.connect(_sync_leaderboards, sender=TrackedUser)
+        pre_delete.connect(_remove_from_leaderboards, sender=TrackedUser)
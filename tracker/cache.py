@@ -0,0 +1,253 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+def normalize_username(username: str) -> str:
+    """Normalize a username for use as a cache key"""
+    return (username or '').strip().lower()
+
+
+class StatsCache:
+    """Tiered cache for parsed user stats.
+
+    Level 1 is a small in-process LRU, level 2 is the configured Django cache
+    backend (shared between workers when a shared backend is configured).
+    Entries stay servable for STATS_CACHE_STALE_TTL seconds but are only
+    considered fresh for STATS_CACHE_TTL seconds.
+    """
+    KEY_PREFIX = 'tracker:stats:'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    @property
+    def fresh_ttl(self):
+        return getattr(settings, 'STATS_CACHE_TTL', 300)
+
+    @property
+    def stale_ttl(self):
+        return getattr(settings, 'STATS_CACHE_STALE_TTL', 86400)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'STATS_CACHE_MAX_ENTRIES', 1000)
+
+    def _key(self, username):
+        return self.KEY_PREFIX + normalize_username(username)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, username):
+        """Return the cached entry ({'stats', 'fetched_at'}) or None if missing/expired."""
+        key = self._key(username)
+        now = time.time()
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                self._local.move_to_end(key)
+
+        if entry is None:
+            try:
+                entry = caches[self.alias].get(key)
+            except Exception:
+                entry = None
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None or now - entry['fetched_at'] > self.stale_ttl:
+            return None
+        return entry
+
+    def is_fresh(self, entry) -> bool:
+        return time.time() - entry['fetched_at'] <= self.fresh_ttl
+
+    def set(self, username, stats: dict, aliases=()):
+        """Store parsed stats under username (and any alias usernames)."""
+        entry = {'stats': stats, 'fetched_at': time.time()}
+        keys = {self._key(username)} | {self._key(a) for a in aliases if a}
+        for key in keys:
+            self._remember(key, entry)
+            try:
+                caches[self.alias].set(key, entry, timeout=self.stale_ttl)
+            except Exception:
+                pass
+
+    def get_shared(self, username):
+        """Read the entry from the shared (level 2) cache only, refreshing level 1."""
+        key = self._key(username)
+        try:
+            entry = caches[self.alias].get(key)
+        except Exception:
+            return None
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def acquire_fetch_lock(self, username) -> bool:
+        """Take the cross-worker fetch lock for username (expires after STATS_SINGLE_FLIGHT_LOCK_TTL)."""
+        try:
+            return caches[self.alias].add(
+                'tracker:fetch-lock:' + normalize_username(username), 1,
+                timeout=getattr(settings, 'STATS_SINGLE_FLIGHT_LOCK_TTL', 60),
+            )
+        except Exception:
+            return True
+
+    def release_fetch_lock(self, username):
+        try:
+            caches[self.alias].delete('tracker:fetch-lock:' + normalize_username(username))
+        except Exception:
+            pass
+
+    def begin_refresh(self, username) -> bool:
+        """Claim the background refresh for username; False if one is already running."""
+        key = self._key(username)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, username):
+        with self._lock:
+            self._refreshing.discard(self._key(username))
+
+
+class RawResponseCache:
+    """Raw upstream payloads keyed by (endpoint kind, username).
+
+    Profile, submissions and contest data change at different rates, so
+    each kind has its own TTL (RAW_PROFILE_CACHE_TTL,
+    RAW_SUBMISSIONS_CACHE_TTL, RAW_CONTEST_CACHE_TTL) and a refresh only
+    refetches the kinds that have expired.
+    """
+    KEY_PREFIX = 'tracker:raw:'
+    TTL_SETTINGS = {
+        'profile': ('RAW_PROFILE_CACHE_TTL', 600),
+        'submissions': ('RAW_SUBMISSIONS_CACHE_TTL', 120),
+        'contest': ('RAW_CONTEST_CACHE_TTL', 86400),
+    }
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def ttl(self, kind: str) -> int:
+        name, default = self.TTL_SETTINGS[kind]
+        return getattr(settings, name, default)
+
+    def _key(self, kind, username):
+        return f'{self.KEY_PREFIX}{kind}:{normalize_username(username)}'
+
+    def get(self, kind: str, username: str):
+        try:
+            return caches[self.alias].get(self._key(kind, username))
+        except Exception:
+            return None
+
+    def set(self, kind: str, username: str, payload):
+        ttl = self.ttl(kind)
+        if ttl <= 0:
+            return
+        try:
+            caches[self.alias].set(self._key(kind, username), payload, timeout=ttl)
+        except Exception:
+            pass
+
+
+class PageCache:
+    """Whole-response cache for anonymous GETs, invalidated by TrackedUser changes.
+
+    Cache keys embed a generation number that is bumped whenever a
+    TrackedUser row changes (saves, deletes and bulk stat updates), so
+    every cached page is dropped at once without tracking which pages show
+    which users. View-count flushes do not bump it: PAGE_CACHE_TTL bounds
+    how stale view counts and view ordering get; 0 disables the cache.
+    """
+    KEY_PREFIX = 'tracker:page:'
+    GENERATION_KEY = 'tracker:page-generation'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'PAGE_CACHE_TTL', 3600)
+
+    def generation(self) -> int:
+        try:
+            generation = caches[self.alias].get(self.GENERATION_KEY)
+            if generation is None:
+                generation = int(time.time() * 1000)
+                caches[self.alias].add(self.GENERATION_KEY, generation, timeout=None)
+                generation = caches[self.alias].get(self.GENERATION_KEY, generation)
+            return generation
+        except Exception:
+            return 0
+
+    def invalidate(self):
+        """Drop every cached page (bump the generation)."""
+        try:
+            caches[self.alias].incr(self.GENERATION_KEY)
+        except ValueError:
+            # Key missing: the next generation() call starts a fresh one
+            pass
+        except Exception:
+            pass
+
+    def _key(self, request):
+        path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+        return f'{self.KEY_PREFIX}{self.generation()}:{path}'
+
+    def __call__(self, view):
+        """Decorator caching a view's 200 responses for anonymous GET requests."""
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            user = getattr(request, 'user', None)
+            if (request.method != 'GET' or self.ttl <= 0
+                    or (user is not None and user.is_authenticated)):
+                return view(request, *args, **kwargs)
+
+            key = self._key(request)
+            try:
+                cached = caches[self.alias].get(key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                content, content_type, headers = cached
+                response = HttpResponse(content, content_type=content_type)
+                for name, value in headers.items():
+                    response[name] = value
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                headers = {name: value for name, value in response.items() if name.lower().startswith('x-next')}
+                try:
+                    caches[self.alias].set(
+                        key, (response.content, response['Content-Type'], headers), timeout=self.ttl
+                    )
+                except Exception:
+                    pass
+            return response
+        return wrapper
+
+
+stats_cache = StatsCache()
+raw_cache = RawResponseCache()
+page_cache = PageCache()
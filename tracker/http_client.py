@@ -0,0 +1,122 @@
+import asyncio
+import atexit
+import contextvars
+import threading
+
+import aiohttp
+from django.conf import settings
+
+
+class SharedClient:
+    """Process-wide event loop and pooled aiohttp session for upstream calls.
+
+    The loop runs forever in a daemon thread and owns a single ClientSession,
+    so connections (and TLS sessions) to the upstream hosts are reused across
+    requests. Sync code submits coroutines with run(); coroutines running on
+    another loop can await run_async(). The thread is started lazily, so each
+    gunicorn worker gets its own after fork.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _is_running(self) -> bool:
+        return self._loop is not None and self._thread is not None and self._thread.is_alive()
+
+    def _ensure_started(self):
+        if self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name='leetcode-http-client', daemon=True)
+            thread.start()
+            ready.wait()
+            self._session = None
+            self._loop, self._thread = loop, thread
+
+    @property
+    def loop(self):
+        self._ensure_started()
+        return self._loop
+
+    def in_client_loop(self) -> bool:
+        """True when called from a coroutine running on the shared loop."""
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro):
+        """Schedule coro on the shared loop and return a concurrent.futures.Future.
+
+        The coroutine runs in an empty contextvars context: inheriting the
+        caller's context would tie its thread-sensitive ORM calls to the
+        caller's request thread (asgiref), which may be blocked waiting on it.
+        """
+        return contextvars.Context().run(asyncio.run_coroutine_threadsafe, coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run coro on the shared loop and block until it finishes."""
+        if self.in_client_loop():
+            coro.close()
+            raise RuntimeError('SharedClient.run() called from the client loop; await the coroutine instead')
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro):
+        """Await coro on the shared loop from any other event loop."""
+        if self.in_client_loop():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session. Must be awaited on the shared loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=getattr(settings, 'UPSTREAM_POOL_LIMIT', 100),
+                limit_per_host=getattr(settings, 'UPSTREAM_POOL_LIMIT_PER_HOST', 20),
+                ttl_dns_cache=getattr(settings, 'UPSTREAM_DNS_CACHE_TTL', 300),
+                keepalive_timeout=getattr(settings, 'UPSTREAM_KEEPALIVE_TIMEOUT', 60),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=getattr(settings, 'UPSTREAM_TIMEOUT', 30)),
+            )
+        return self._session
+
+    def shutdown(self, timeout=5):
+        """Close the session and stop the loop thread (safe to call more than once)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or not loop.is_running():
+            return
+
+        async def _close_session():
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close_session(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+shared_client = SharedClient()
+atexit.register(shared_client.shutdown)
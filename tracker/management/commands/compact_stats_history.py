@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tracker.models import StatsSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold old raw stats snapshots into daily rows (after SNAPSHOT_RAW_DAYS) and old "
+        "daily rows into weekly rows (after SNAPSHOT_DAILY_DAYS). Safe to run repeatedly."
+    )
+
+    def handle(self, *args, **options):
+        removed = StatsSnapshot.compact()
+        self.stdout.write(f"raw -> daily: {removed[StatsSnapshot.RAW]} rows folded")
+        self.stdout.write(f"daily -> weekly: {removed[StatsSnapshot.DAILY]} rows folded")
+        for period, label in StatsSnapshot.PERIOD_CHOICES:
+            self.stdout.write(f"{label}: {StatsSnapshot.objects.filter(period=period).count()} rows")
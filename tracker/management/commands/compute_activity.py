@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from tracker.activity_engine import COHORT_DAYS, WINDOWS, refresh_activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute streaks and recent activity for every tracked user from the stored "
+        "calendars and refresh the streak leaderboard. Run shortly after midnight UTC "
+        "so broken streaks roll over."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Users per day matrix (default ACTIVITY_BATCH_SIZE).')
+        parser.add_argument('--cohort-days', type=int, default=0,
+                            help=f'Also print population totals for the last N days (max {COHORT_DAYS}).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Compute and report without writing anything.')
+
+    def handle(self, *args, **options):
+        result = refresh_activity(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        users = result['users'].values()
+
+        self.stdout.write(f"users: {len(result['users'])}")
+        for window in WINDOWS:
+            active = sum(1 for u in users if u[f'active_days_{window}'])
+            self.stdout.write(f"active in last {window} days: {active}")
+        self.stdout.write(f"current streaks: {sum(1 for u in users if u['current_streak'])}")
+        verb = 'would update' if options['dry_run'] else 'updated'
+        self.stdout.write(f"{verb}: {result['users_updated']} users, {result['activity_updated']} activity rows")
+
+        days = max(0, min(options['cohort_days'], COHORT_DAYS))
+        if days:
+            epoch = date(1970, 1, 1)
+            first = result['today'] - days + 1
+            for offset in range(days):
+                day = epoch + timedelta(days=first + offset)
+                index = COHORT_DAYS - days + offset
+                self.stdout.write(
+                    f"{day.isoformat()}  {int(result['cohort_active_users'][index]):>7} users  "
+                    f"{int(result['cohort_submissions'][index]):>8} submissions"
+                )
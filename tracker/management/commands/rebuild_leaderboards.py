@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from tracker.models import ContestParticipation, LeaderboardEntry
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized leaderboard snapshots from the TrackedUser table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', choices=sorted(LeaderboardEntry.CATEGORIES),
+                            help='Only rebuild this category (default: all).')
+
+    def handle(self, *args, **options):
+        category = options.get('category')
+        LeaderboardEntry.rebuild(category)
+        categories = [category] if category else list(LeaderboardEntry.CATEGORIES)
+        for name in categories:
+            count = LeaderboardEntry.objects.filter(category=name).count()
+            self.stdout.write(f"{name}: {count} entries")
+        if category in (None, 'contest'):
+            updated = ContestParticipation.refresh_percentiles()
+            self.stdout.write(f"contest percentiles: {updated} updated")
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from tracker.http_client import shared_client
+from tracker.models import TrackedUser
+from tracker.views import get_user_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh TrackedUser stats from the upstream APIs, least recently fetched "
+        "first (most viewed first within a batch). Runs continuously unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Refresh one batch of due users and exit (for cron).')
+        parser.add_argument('--concurrency', type=int, default=5,
+                            help='Maximum number of concurrent upstream fetches (default 5).')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Users refreshed per cycle (default 50).')
+        parser.add_argument('--min-age', type=int, default=None,
+                            help='Only refresh users older than this many seconds (default STATS_CACHE_TTL).')
+        parser.add_argument('--sleep', type=int, default=30,
+                            help='Seconds to wait when no user is due (default 30).')
+
+    def handle(self, *args, **options):
+        min_age = options['min_age']
+        if min_age is None:
+            min_age = getattr(settings, 'STATS_CACHE_TTL', 300)
+        concurrency = max(1, options['concurrency'])
+        batch_size = max(1, options['batch_size'])
+
+        # When this worker last refreshed each user. update_stats throttles
+        # last_fetched writes for unchanged users, so it can lag a little.
+        self.refreshed_at = {}
+
+        try:
+            batches = None
+            while True:
+                due = next(batches, None) if batches is not None else None
+                if due is None:
+                    # Previous pass done: start a new one from the oldest user
+                    batches = self.due_batches(min_age, batch_size)
+                    due = next(batches, None)
+                if due:
+                    self.refresh_batch(due, concurrency)
+                if options['once']:
+                    break
+                if not due:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+        finally:
+            shared_client.shutdown()
+
+    def due_batches(self, min_age: int, batch_size: int):
+        """Yield batches of due usernames from one pass over the table.
+
+        Users never fetched, then users not fetched for min_age seconds, are
+        read in (last_fetched, id) order one keyset page per batch, so each
+        batch is an index range scan rather than a sort of every user.
+        Within a batch the most viewed users are refreshed first.
+        """
+        now = timezone.now()
+        never = TrackedUser.objects.filter(last_fetched__isnull=True)
+        stale = TrackedUser.objects.filter(last_fetched__lt=now - timedelta(seconds=min_age))
+        for rows in chain(self._pages(never, batch_size), self._pages(stale, batch_size)):
+            # Skip users this worker refreshed recently but whose last_fetched
+            # write update_stats throttled
+            recent = now.timestamp() - min_age
+            rows = [r for r in rows if self.refreshed_at.get(r[0], 0) < recent]
+            rows.sort(key=lambda r: r[3] or 0, reverse=True)
+            if rows:
+                yield [r[0] for r in rows]
+
+    @staticmethod
+    def _pages(users, batch_size: int):
+        """(username, last_fetched, pk, view_count) pages of users in (last_fetched, id) order.
+
+        last_fetched must be either NULL or set for all of users.
+        """
+        after = None
+        while True:
+            page = users
+            if after is not None:
+                last_fetched, pk = after
+                if last_fetched is None:
+                    page = page.filter(pk__gt=pk)
+                else:
+                    # The >= bound lets the database seek the index to the page
+                    page = page.filter(last_fetched__gte=last_fetched).filter(
+                        Q(last_fetched__gt=last_fetched) | Q(pk__gt=pk)
+                    )
+            rows = list(
+                page.order_by('last_fetched', 'pk')
+                .values_list('username', 'last_fetched', 'pk', 'view_count')[:batch_size]
+            )
+            if not rows:
+                return
+            after = rows[-1][1], rows[-1][2]
+            yield rows
+
+    def refresh_batch(self, usernames, concurrency: int):
+        started = time.monotonic()
+        results = shared_client.run(self._refresh_all(usernames, concurrency))
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        ok = 0
+        for username, result in zip(usernames, results):
+            self.refreshed_at[username] = time.time()
+            if isinstance(result, dict) and not result.get('error'):
+                ok += 1
+            else:
+                error = result.get('error') if isinstance(result, dict) else result
+                self.stderr.write(f'  {username}: {error}')
+
+        self.stdout.write(
+            f'Refreshed {len(usernames)} users ({ok} ok, {len(usernames) - ok} failed) '
+            f'in {elapsed:.1f}s - {len(usernames) / elapsed * 60:.1f} users/min'
+        )
+
+    async def _refresh_all(self, usernames, concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def refresh(username):
+            async with semaphore:
+                return await get_user_data(username, force_refresh=True)
+
+        return await asyncio.gather(*[refresh(u) for u in usernames], return_exceptions=True)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_add_recent_submissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title_slug', models.CharField(max_length=255)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(blank=True, max_length=50)),
+                ('lang', models.CharField(blank=True, max_length=50)),
+                ('timestamp', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='tracker.trackeduser')),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user', '-timestamp'], name='tracker_sub_user_id_62de9e_idx'), models.Index(fields=['title_slug', '-timestamp'], name='tracker_sub_title_s_031f5a_idx'), models.Index(fields=['-timestamp'], name='tracker_sub_timesta_48fbef_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'title_slug', 'timestamp'), name='unique_submission_per_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated migration: copy recent_submissions JSON into the Submission table
+from datetime import datetime, timezone
+
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def backfill_submissions(apps, schema_editor):
+    TrackedUser = apps.get_model('tracker', 'TrackedUser')
+    Submission = apps.get_model('tracker', 'Submission')
+
+    rows = []
+    for user in TrackedUser.objects.exclude(recent_submissions=[]).iterator():
+        for sub in user.recent_submissions or []:
+            if not isinstance(sub, dict):
+                continue
+            try:
+                ts = int(sub.get('timestamp'))
+            except (ValueError, TypeError):
+                continue
+            title = str(sub.get('title') or '')[:255]
+            slug = str(sub.get('title_slug') or '') or slugify(title)
+            if not slug:
+                continue
+            rows.append(Submission(
+                user_id=user.pk,
+                title_slug=slug[:255],
+                title=title,
+                status=str(sub.get('status') or '')[:50],
+                lang=str(sub.get('lang') or '')[:50],
+                timestamp=datetime.fromtimestamp(ts, tz=timezone.utc),
+            ))
+        if len(rows) >= 1000:
+            Submission.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    if rows:
+        Submission.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_submission'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_submissions, migrations.RunPython.noop),
+    ]
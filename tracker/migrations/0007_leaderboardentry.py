@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_backfill_submissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('value', models.FloatField()),
+                ('rank', models.IntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='tracker.trackeduser')),
+            ],
+            options={
+                'ordering': ['category', 'rank', 'user_id'],
+                'indexes': [models.Index(fields=['category', 'rank'], name='tracker_lea_categor_18238a_idx'), models.Index(fields=['category', '-value'], name='tracker_lea_categor_6d983a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'user'), name='unique_leaderboard_entry')],
+            },
+        ),
+    ]
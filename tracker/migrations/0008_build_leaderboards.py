@@ -0,0 +1,41 @@
+# Generated migration: build the initial leaderboard snapshots
+from django.db import migrations
+from django.db.models import F
+
+CATEGORIES = {
+    'total': 'total_solved',
+    'easy': 'easy_solved',
+    'medium': 'medium_solved',
+    'hard': 'hard_solved',
+    'contest': 'contest_rating',
+    'streak': 'current_streak',
+}
+
+
+def build_leaderboards(apps, schema_editor):
+    TrackedUser = apps.get_model('tracker', 'TrackedUser')
+    LeaderboardEntry = apps.get_model('tracker', 'LeaderboardEntry')
+
+    for category, field in CATEGORIES.items():
+        rows = (
+            TrackedUser.objects.filter(**{f'{field}__isnull': False})
+            .order_by(F(field).desc(), 'pk')
+            .values_list('pk', field)
+        )
+        entries, rank, previous = [], 0, None
+        for position, (user_id, value) in enumerate(rows.iterator(), 1):
+            if value != previous:
+                rank, previous = position, value
+            entries.append(LeaderboardEntry(category=category, user_id=user_id, value=float(value), rank=rank))
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_leaderboards, migrations.RunPython.noop),
+    ]
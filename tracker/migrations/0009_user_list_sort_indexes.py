@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:17
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_build_leaderboards'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trackeduser',
+            index=models.Index(fields=['-contest_rating', '-id'], name='trackeduser_rating_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackeduser',
+            index=models.Index(models.OrderBy(django.db.models.functions.comparison.Coalesce('last_submission', 'last_updated'), descending=True), models.OrderBy(models.F('id'), descending=True), name='trackeduser_recent_sort_idx'),
+        ),
+    ]
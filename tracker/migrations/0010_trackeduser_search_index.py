@@ -0,0 +1,59 @@
+# Generated migration: FTS5 trigram search index over username/display_name (SQLite only)
+#
+# The DDL is spelled out here rather than imported from tracker.search, so
+# this migration keeps doing the same thing whatever that module becomes.
+from django.db import migrations
+
+FTS_TABLE = 'tracker_trackeduser_fts'
+USER_TABLE = 'tracker_trackeduser'
+
+TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF username, display_name ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+            INSERT INTO {FTS_TABLE}(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END""",
+}
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"username, display_name, content='{USER_TABLE}', content_rowid='id', tokenize='trigram')"
+    )
+    for sql in TRIGGERS.values():
+        schema_editor.execute(sql)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_user_list_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_trackeduser_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to='tracker.trackeduser')),
+                ('start_day', models.IntegerField(default=0)),
+                ('counts', models.BinaryField(default=bytes)),
+                ('last_day', models.IntegerField(blank=True, null=True)),
+                ('last_active_day', models.IntegerField(blank=True, null=True)),
+                ('run_length', models.IntegerField(default=0)),
+                ('max_streak', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_useractivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='useractivity',
+            name='active_days_30',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='useractivity',
+            name='active_days_365',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='useractivity',
+            name='active_days_7',
+            field=models.IntegerField(default=0),
+        ),
+    ]
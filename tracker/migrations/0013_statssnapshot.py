@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_useractivity_active_days'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('r', 'raw'), ('d', 'daily'), ('w', 'weekly')], default='r', max_length=1)),
+                ('taken_at', models.DateTimeField()),
+                ('total_solved', models.PositiveSmallIntegerField(default=0)),
+                ('easy_solved', models.PositiveSmallIntegerField(default=0)),
+                ('medium_solved', models.PositiveSmallIntegerField(default=0)),
+                ('hard_solved', models.PositiveSmallIntegerField(default=0)),
+                ('ranking', models.IntegerField(blank=True, null=True)),
+                ('contest_rating', models.FloatField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='tracker.trackeduser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'taken_at'], name='tracker_sta_user_id_b3baf7_idx'), models.Index(fields=['period', 'taken_at'], name='tracker_sta_period_5bdb50_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'period', 'taken_at'), name='unique_stats_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_statssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trackeduser',
+            name='best_contest_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trackeduser',
+            name='contest_percentile',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trackeduser',
+            name='contests_attended',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trackeduser',
+            name='last_contest_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trackeduser',
+            name='last_rating_delta',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ContestParticipation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('start_time', models.DateTimeField()),
+                ('rating', models.FloatField()),
+                ('rating_delta', models.FloatField(blank=True, null=True)),
+                ('ranking', models.IntegerField(blank=True, null=True)),
+                ('problems_solved', models.PositiveSmallIntegerField(default=0)),
+                ('total_problems', models.PositiveSmallIntegerField(default=0)),
+                ('finish_time_seconds', models.IntegerField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contests', to='tracker.trackeduser')),
+            ],
+            options={
+                'ordering': ['start_time'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'start_time'), name='unique_contest_per_user')],
+            },
+        ),
+    ]
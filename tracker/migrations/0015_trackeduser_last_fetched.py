@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 07:47
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_last_fetched(apps, schema_editor):
+    # Rows filled by a fetch so far had last_updated stamped by it; rows
+    # never filled still have last_updated == first_tracked
+    TrackedUser = apps.get_model('tracker', 'TrackedUser')
+    TrackedUser.objects.filter(
+        last_updated__gte=F('first_tracked') + timedelta(seconds=1)
+    ).update(last_fetched=F('last_updated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_contestparticipation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trackeduser',
+            name='last_fetched',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_fetched, migrations.RunPython.noop),
+    ]
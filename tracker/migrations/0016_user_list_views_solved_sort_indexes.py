@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_trackeduser_last_fetched'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='trackeduser',
+            name='tracker_tra_view_co_8af287_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='trackeduser',
+            name='tracker_tra_total_s_44fc41_idx',
+        ),
+        migrations.AddIndex(
+            model_name='trackeduser',
+            index=models.Index(fields=['-view_count', '-id'], name='trackeduser_views_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackeduser',
+            index=models.Index(fields=['-total_solved', '-id'], name='trackeduser_solved_sort_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0016_user_list_views_solved_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trackeduser',
+            index=models.Index(fields=['last_fetched', 'id'], name='trackeduser_fetch_due_idx'),
+        ),
+    ]
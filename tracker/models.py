@@ -1,5 +1,24 @@
-from django.db import models
+import logging
+import sys
+from array import array
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.text import slugify
+
+from .activity import parse_calendar, today_day
+from .cache import page_cache
+from .counters import view_counter
+
+logger = logging.getLogger(__name__)
+
+# Number of submissions kept inline on TrackedUser for list/preview rendering
+RECENT_SUBMISSIONS_PREVIEW = 20
 
 class TrackedUser(models.Model):
     """Store information about tracked LeetCode users"""
@@ -13,6 +32,13 @@ class TrackedUser(models.Model):
     hard_solved = models.IntegerField(default=0)
     ranking = models.IntegerField(null=True, blank=True)
     contest_rating = models.FloatField(null=True, blank=True)
+
+    # Contest aggregates, maintained by ContestParticipation.ingest
+    contests_attended = models.IntegerField(default=0)
+    best_contest_rating = models.FloatField(null=True, blank=True)
+    last_rating_delta = models.FloatField(null=True, blank=True)
+    contest_percentile = models.FloatField(null=True, blank=True)
+    last_contest_at = models.DateTimeField(null=True, blank=True)
     
     # Streaks
     current_streak = models.IntegerField(default=0)
@@ -24,6 +50,7 @@ class TrackedUser(models.Model):
     # Metadata
     first_tracked = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
+    last_fetched = models.DateTimeField(null=True, blank=True)
     last_submission = models.DateTimeField(null=True, blank=True)
     view_count = models.IntegerField(default=0)
     is_featured = models.BooleanField(default=False)
@@ -31,20 +58,161 @@ class TrackedUser(models.Model):
     class Meta:
         ordering = ['-view_count', '-total_solved']
         indexes = [
-            models.Index(fields=['-view_count']),
-            models.Index(fields=['-total_solved']),
+            # Sort keys of api_users_list's modes, with the id tiebreaker
+            models.Index(fields=['-view_count', '-id'], name='trackeduser_views_sort_idx'),
+            models.Index(fields=['-total_solved', '-id'], name='trackeduser_solved_sort_idx'),
+            models.Index(fields=['-contest_rating', '-id'], name='trackeduser_rating_sort_idx'),
+            # refresh_tracked_users walks due users in this order
+            models.Index(fields=['last_fetched', 'id'], name='trackeduser_fetch_due_idx'),
+            models.Index(
+                Coalesce('last_submission', 'last_updated').desc(), F('id').desc(),
+                name='trackeduser_recent_sort_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.display_name or self.username} ({self.total_solved} solved)"
     
     def increment_views(self):
-        """Increment view count."""
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        """Increment view count (buffered and flushed to the database in bulk).
+
+        view_count then includes this worker's views that are not flushed yet.
+        """
+        view_counter.increment(self.username)
+        self.view_count += max(view_counter.pending(self.username), 1)
     
-    def update_stats(self, stats_data: dict):
-        """Update cached statistics from normalized stats dict."""
+    # Fields written by update_stats
+    STATS_FIELDS = (
+        'display_name', 'total_solved', 'easy_solved', 'medium_solved', 'hard_solved',
+        'ranking', 'contest_rating', 'current_streak', 'max_streak',
+        'recent_submissions', 'last_submission',
+    )
+
+    def update_stats(self, stats_data: dict, calendar=None, contest_history=None) -> dict:
+        """Update cached statistics from normalized stats dict.
+
+        Only changed fields are written (nothing at all when the stats are
+        identical). Returns the changes as {field: (old, new)}. See
+        update_stats_many, of which this is the single-user case.
+        """
+        if self.pk is None:
+            self.save()
+        return self.update_stats_many([(self, stats_data, calendar, contest_history)]).get(self.pk, {})
+
+    @classmethod
+    def update_stats_many(cls, entries) -> dict:
+        """Apply freshly parsed stats to several saved users in one transaction.
+
+        entries are (user, stats_data, calendar, contest_history) tuples, the
+        last two raw upstream values or None. Calendars are merged into the
+        stored activity (which then supplies the streaks) and new contests
+        stored with their aggregates. Changed rows are written with one
+        bulk_update, and snapshots, new submissions and leaderboard
+        positions follow. Returns {user.pk: changes}.
+        """
+        entries = [entry for entry in entries if entry[0].pk is not None]
+        if not entries:
+            return {}
+
+        with transaction.atomic():
+            activities = {}
+            calendars = [(user, calendar) for user, _, calendar, _ in entries if calendar]
+            if calendars:
+                try:
+                    with transaction.atomic():
+                        activities = UserActivity.merge_many(calendars)
+                except Exception:
+                    activities = {}
+
+            now = timezone.now()
+            # last_fetched of unchanged users is only rewritten once it is half
+            # a stats TTL old, so no-op refreshes stay (nearly) write-free
+            refetched_before = now - timedelta(seconds=getattr(settings, 'STATS_CACHE_TTL', 300) / 2)
+            all_changes, dirty, touched, new_submissions = {}, [], [], []
+            fields = {'last_updated', 'last_fetched'}
+            for user, stats_data, calendar, contest_history in entries:
+                if user.pk in activities:
+                    stats_data = activities[user.pk].with_streaks(stats_data)
+                elif calendar:
+                    # Merge failed or nothing active yet: keep the stored streaks
+                    stats_data = dict(stats_data, current_streak=user.current_streak, max_streak=user.max_streak)
+                changes = user.apply_stats(stats_data)
+                if contest_history or 'contest_rating' in changes:
+                    try:
+                        with transaction.atomic():
+                            changes.update(ContestParticipation.ingest(user, contest_history, 'contest_rating' in changes))
+                    except Exception:
+                        pass
+                all_changes[user.pk] = changes
+
+                if changes:
+                    user.last_updated = user.last_fetched = now
+                    fields.update(changes)
+                    dirty.append(user)
+                elif user.last_fetched is None or user.last_fetched < refetched_before:
+                    user.last_fetched = now
+                    touched.append(user)
+                if 'recent_submissions' in changes:
+                    new_submissions.append((user, stats_data.get('recent_submissions')))
+
+            if dirty:
+                cls.objects.bulk_update(dirty, sorted(fields), batch_size=200)
+                transaction.on_commit(page_cache.invalidate)
+                snapshots = [StatsSnapshot.from_user(u, now) for u in dirty if StatsSnapshot.is_tracked(all_changes[u.pk])]
+                if snapshots:
+                    StatsSnapshot.objects.bulk_create(snapshots, ignore_conflicts=True, batch_size=500)
+            if touched:
+                cls.objects.bulk_update(touched, ['last_fetched'], batch_size=500)
+            if new_submissions:
+                try:
+                    with transaction.atomic():
+                        Submission.ingest_many(new_submissions)
+                except Exception:
+                    pass
+            for user in dirty:
+                LeaderboardEntry.sync_user_or_mark(user, all_changes[user.pk])
+            if dirty:
+                # Also retries categories whose earlier rebuild failed
+                transaction.on_commit(LeaderboardEntry.rebuild_stale)
+
+        return all_changes
+
+    @classmethod
+    def store_stats_many(cls, items) -> dict:
+        """Create missing users and update_stats_many for (username, stats, calendar, contest_history) items.
+
+        The stats' canonical username wins over the requested one. Returns
+        {username: TrackedUser} holding the stored values.
+        """
+        by_username = {}
+        for username, stats_data, calendar, contest_history in items:
+            by_username[stats_data.get('username') or username] = (stats_data, calendar, contest_history)
+        if not by_username:
+            return {}
+
+        with transaction.atomic():
+            existing = {u.username: u for u in cls.objects.filter(username__in=by_username)}
+            missing = [name for name in by_username if name not in existing]
+            if missing:
+                cls.objects.bulk_create(
+                    [cls(username=name, display_name=by_username[name][0].get('display_name', name)) for name in missing],
+                    ignore_conflicts=True,
+                )
+                existing.update({u.username: u for u in cls.objects.filter(username__in=missing)})
+
+            users = {name: existing[name] for name in by_username if name in existing}
+            all_changes = cls.update_stats_many([(user, *by_username[name]) for name, user in users.items()])
+            # bulk_create sends no post_save, so new users whose stats match
+            # the defaults still need their leaderboard entries
+            for name in missing:
+                if name in users and not all_changes.get(users[name].pk):
+                    LeaderboardEntry.sync_user_or_mark(users[name])
+        return users
+
+    def apply_stats(self, stats_data: dict) -> dict:
+        """Set stats fields from a normalized stats dict without saving; returns {field: (old, new)}."""
+        previous = {f: getattr(self, f) for f in self.STATS_FIELDS}
+
         self.display_name = stats_data.get('display_name', self.username)
         self.total_solved = int(stats_data.get('total_solved', 0) or 0)
         # Handle both 'easy_solved' and 'easy' field names
@@ -74,11 +242,12 @@ class TrackedUser(models.Model):
         except (ValueError, TypeError):
             self.max_streak = 0
         
-        # Store recent submissions (limit to 50)
+        # Store a short preview of recent submissions; full history lives in
+        # the Submission table
         try:
             recs = stats_data.get('recent_submissions', [])
             if isinstance(recs, list):
-                self.recent_submissions = recs[:50]
+                self.recent_submissions = recs[:RECENT_SUBMISSIONS_PREVIEW]
         except Exception:
             self.recent_submissions = []
         
@@ -88,9 +257,616 @@ class TrackedUser(models.Model):
                 ts = self.recent_submissions[0].get('timestamp')
                 if ts:
                     self.last_submission = timezone.datetime.fromtimestamp(
-                        int(ts), tz=timezone.utc
+                        int(ts), tz=dt_timezone.utc
                     )
         except Exception:
             pass
         
-        self.save()
+        return {
+            f: (old, getattr(self, f))
+            for f, old in previous.items()
+            if getattr(self, f) != old
+        }
+
+
+class Submission(models.Model):
+    """A single LeetCode submission by a tracked user"""
+    user = models.ForeignKey(TrackedUser, on_delete=models.CASCADE, related_name='submissions')
+    title_slug = models.CharField(max_length=255)
+    title = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=50, blank=True)
+    lang = models.CharField(max_length=50, blank=True)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-timestamp']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'title_slug', 'timestamp'],
+                name='unique_submission_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-timestamp']),
+            models.Index(fields=['title_slug', '-timestamp']),
+            models.Index(fields=['-timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.title_slug} ({self.status})"
+
+    @classmethod
+    def from_dict(cls, user, sub: dict):
+        """Build an unsaved Submission from a normalized submission dict, or None if unusable."""
+        try:
+            ts = int(sub.get('timestamp'))
+        except (ValueError, TypeError):
+            return None
+        title = str(sub.get('title') or '')[:255]
+        slug = str(sub.get('title_slug') or '') or slugify(title)
+        if not slug:
+            return None
+        return cls(
+            user=user,
+            title_slug=slug[:255],
+            title=title,
+            status=str(sub.get('status') or '')[:50],
+            lang=str(sub.get('lang') or '')[:50],
+            timestamp=timezone.datetime.fromtimestamp(ts, tz=dt_timezone.utc),
+        )
+
+    @classmethod
+    def ingest_many(cls, user_submissions):
+        """Insert new submissions for several (user, submissions) pairs at once and apply retention."""
+        rows = [
+            r for user, submissions in user_submissions
+            for r in (cls.from_dict(user, s) for s in submissions or [] if isinstance(s, dict)) if r
+        ]
+        if not rows:
+            return
+        cls.objects.bulk_create(rows, ignore_conflicts=True, batch_size=500)
+        for user in {r.user for r in rows}:
+            cls.prune(user)
+
+    @classmethod
+    def prune(cls, user):
+        """Drop submissions past SUBMISSION_RETENTION_DAYS or beyond SUBMISSION_MAX_PER_USER."""
+        qs = cls.objects.filter(user=user)
+        days = getattr(settings, 'SUBMISSION_RETENTION_DAYS', 365)
+        if days:
+            qs.filter(timestamp__lt=timezone.now() - timedelta(days=days)).delete()
+        limit = getattr(settings, 'SUBMISSION_MAX_PER_USER', 1000)
+        if limit:
+            cutoff = list(qs.order_by('-timestamp').values_list('timestamp', flat=True)[limit:limit + 1])
+            if cutoff:
+                qs.filter(timestamp__lte=cutoff[0]).delete()
+
+
+class LeaderboardEntry(models.Model):
+    """Materialized leaderboard position of a user in one category.
+
+    Ranks use competition ranking (1 + number of users with a strictly
+    higher value), so tied users share a rank. They are maintained
+    incrementally by sync_user() whenever update_stats changes a ranked
+    field, and when a user is created or deleted (see tracker.apps);
+    `manage.py rebuild_leaderboards` recomputes everything. A category
+    whose sync failed is marked stale and rebuilt once the write commits.
+    """
+    # Category name -> TrackedUser field it ranks by (descending)
+    CATEGORIES = {
+        'total': 'total_solved',
+        'easy': 'easy_solved',
+        'medium': 'medium_solved',
+        'hard': 'hard_solved',
+        'contest': 'contest_rating',
+        'streak': 'current_streak',
+    }
+    STALE_KEY = 'tracker:leaderboard-stale'
+
+    category = models.CharField(max_length=20)
+    user = models.ForeignKey(TrackedUser, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    value = models.FloatField()
+    rank = models.IntegerField()
+
+    class Meta:
+        ordering = ['category', 'rank', 'user_id']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'user'], name='unique_leaderboard_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'rank']),
+            models.Index(fields=['category', '-value']),
+        ]
+
+    def __str__(self):
+        return f"{self.category} #{self.rank}: {self.user_id} ({self.value})"
+
+    @classmethod
+    def sync_user(cls, user, changes=None):
+        """Bring user's entries in line with its current stats.
+
+        changes is the dict returned by update_stats/apply_stats; categories
+        whose field did not change are left alone. Other users' ranks are
+        shifted with range updates instead of re-ranking the category.
+        """
+        with transaction.atomic():
+            entries = {e.category: e for e in cls.objects.filter(user=user)}
+            for category, field in cls.CATEGORIES.items():
+                value = getattr(user, field)
+                entry = entries.get(category)
+                if entry is None:
+                    if value is not None:
+                        cls._insert(user, category, float(value))
+                elif value is None:
+                    cls._remove(entry)
+                elif (changes is None or field in changes) and float(value) != entry.value:
+                    cls._move(entry, float(value))
+
+    @classmethod
+    def sync_user_or_mark(cls, user, changes=None):
+        """sync_user(), but on failure log it and have the categories rebuilt after commit."""
+        try:
+            cls.sync_user(user, changes)
+        except Exception:
+            logger.exception("Leaderboard sync failed for %s", user.username)
+            cls.mark_stale(changes)
+            transaction.on_commit(cls.rebuild_stale)
+
+    @classmethod
+    def remove_user(cls, user):
+        """Delete user's entries, moving everyone ranked below it up one place."""
+        try:
+            with transaction.atomic():
+                for entry in cls.objects.filter(user=user):
+                    cls._remove(entry)
+        except Exception:
+            logger.exception("Leaderboard removal failed for %s", user.username)
+            cls.mark_stale()
+            transaction.on_commit(cls.rebuild_stale)
+
+    @classmethod
+    def _insert(cls, user, category, value):
+        board = cls.objects.filter(category=category)
+        board.filter(value__lt=value).update(rank=F('rank') + 1)
+        rank = board.filter(value__gt=value).count() + 1
+        cls.objects.create(category=category, user=user, value=value, rank=rank)
+
+    @classmethod
+    def _remove(cls, entry):
+        entry.delete()
+        cls.objects.filter(category=entry.category, value__lt=entry.value).update(rank=F('rank') - 1)
+
+    @classmethod
+    def _move(cls, entry, value):
+        others = cls.objects.filter(category=entry.category).exclude(pk=entry.pk)
+        if value > entry.value:
+            others.filter(value__gte=entry.value, value__lt=value).update(rank=F('rank') + 1)
+        else:
+            others.filter(value__gte=value, value__lt=entry.value).update(rank=F('rank') - 1)
+        entry.value = value
+        entry.rank = others.filter(value__gt=value).count() + 1
+        entry.save(update_fields=['value', 'rank'])
+
+    @classmethod
+    def mark_stale(cls, changes=None):
+        """Have rebuild_stale() recompute the categories ranking a field in changes (all if None).
+
+        For when sync_user(user, changes) failed and rolled back.
+        """
+        cls._add_stale([c for c, f in cls.CATEGORIES.items() if changes is None or f in changes])
+
+    @classmethod
+    def _add_stale(cls, categories):
+        try:
+            cache.set(cls.STALE_KEY, sorted(set(categories) | set(cache.get(cls.STALE_KEY) or ())), timeout=None)
+        except Exception:
+            logger.exception("Could not mark leaderboards %s for rebuild", sorted(categories))
+
+    @classmethod
+    def rebuild_stale(cls) -> list:
+        """Rebuild the categories marked by mark_stale(); returns their names."""
+        try:
+            stale = cache.get(cls.STALE_KEY) or []
+        except Exception:
+            return []
+        for category in stale:
+            try:
+                cls.rebuild(category)
+            except Exception:
+                logger.exception("Rebuilding leaderboard %s failed", category)
+                cls._add_stale([category])
+        return stale
+
+    @classmethod
+    def rebuild(cls, category=None):
+        """Recompute one category (or all of them) from the TrackedUser table."""
+        categories = [category] if category else list(cls.CATEGORIES)
+        try:
+            # Cleared first, so a sync failing during the rebuild marks it again
+            stale = set(cache.get(cls.STALE_KEY) or ())
+            if stale & set(categories):
+                cache.set(cls.STALE_KEY, sorted(stale - set(categories)), timeout=None)
+        except Exception:
+            pass
+        with transaction.atomic():
+            for name in categories:
+                field = cls.CATEGORIES[name]
+                rows = (
+                    TrackedUser.objects.filter(**{f'{field}__isnull': False})
+                    .order_by(F(field).desc(), 'pk')
+                    .values_list('pk', field)
+                )
+                entries, rank, previous = [], 0, None
+                for position, (user_id, value) in enumerate(rows.iterator(), 1):
+                    if value != previous:
+                        rank, previous = position, value
+                    entries.append(cls(category=name, user_id=user_id, value=float(value), rank=rank))
+                cls.objects.filter(category=name).delete()
+                cls.objects.bulk_create(entries, batch_size=500)
+            transaction.on_commit(page_cache.invalidate)
+
+
+class UserActivity(models.Model):
+    """Per-day submission counts of a tracked user.
+
+    counts holds one little-endian uint16 per UTC day starting at
+    start_day (days since the epoch). Merging a fetched calendar only looks
+    at days from last_day on, and the streak state (the run of consecutive
+    active days ending at last_active_day, and the longest run) is advanced
+    from those days alone, so a refresh costs O(new days). History older
+    than the upstream calendar window is kept.
+    """
+    user = models.OneToOneField(TrackedUser, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    start_day = models.IntegerField(default=0)
+    counts = models.BinaryField(default=bytes)
+    last_day = models.IntegerField(null=True, blank=True)
+    last_active_day = models.IntegerField(null=True, blank=True)
+    run_length = models.IntegerField(default=0)
+    max_streak = models.IntegerField(default=0)
+    # Filled in by the batch engine (tracker.activity_engine)
+    active_days_7 = models.IntegerField(default=0)
+    active_days_30 = models.IntegerField(default=0)
+    active_days_365 = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.active_days()} active days"
+
+    def get_counts(self) -> array:
+        values = array('H')
+        values.frombytes(bytes(self.counts or b''))
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    def set_counts(self, values: array):
+        if sys.byteorder != 'little':
+            values = array('H', values)
+            values.byteswap()
+        self.counts = values.tobytes()
+
+    def current_streak(self, today=None) -> int:
+        """Length of the streak still alive today (active today or yesterday)"""
+        if self.last_active_day is None:
+            return 0
+        today = today_day() if today is None else today
+        return self.run_length if self.last_active_day >= today - 1 else 0
+
+    def active_days(self) -> int:
+        return sum(1 for c in self.get_counts() if c)
+
+    def with_streaks(self, stats_data: dict) -> dict:
+        return dict(stats_data, current_streak=self.current_streak(), max_streak=self.max_streak)
+
+    def merge(self, days: dict) -> bool:
+        """Merge {day: count} into the stored counts; returns True if anything changed."""
+        if self.last_day is not None:
+            days = {d: c for d, c in days.items() if d >= self.last_day}
+        if not days:
+            return False
+
+        values = self.get_counts()
+        if not values:
+            self.start_day = min(days)
+        changed = False
+        for day, count in sorted(days.items()):
+            if day < self.start_day:
+                continue
+            index = day - self.start_day
+            if index >= len(values):
+                values.extend([0] * (index + 1 - len(values)))
+            count = min(count, 0xFFFF)
+            if values[index] != count:
+                values[index] = count
+                changed = True
+            if self.last_active_day is None or day > self.last_active_day:
+                if self.last_active_day is not None and day == self.last_active_day + 1:
+                    self.run_length += 1
+                else:
+                    self.run_length = 1
+                self.last_active_day = day
+                self.max_streak = max(self.max_streak, self.run_length)
+                changed = True
+        self.last_day = max(self.last_day or 0, max(days))
+        self.set_counts(values)
+        return changed
+
+    @classmethod
+    def merge_many(cls, user_calendars) -> dict:
+        """Merge raw calendars for (user, submissionCalendar) pairs; returns {user_id: UserActivity}.
+
+        No row is created for a user whose calendar has no active day yet.
+        """
+        parsed = {user.pk: (user, parse_calendar(calendar)) for user, calendar in user_calendars}
+        existing = cls.objects.in_bulk(list(parsed))
+        created, updated = [], []
+        for user_id, (user, days) in parsed.items():
+            activity = existing.get(user_id)
+            if activity is None:
+                if not days:
+                    continue
+                activity = cls(user=user)
+                activity.merge(days)
+                created.append(activity)
+            elif activity.merge(days):
+                updated.append(activity)
+            existing[user_id] = activity
+        if created:
+            cls.objects.bulk_create(created, ignore_conflicts=True)
+        if updated:
+            cls.objects.bulk_update(
+                updated, ['start_day', 'counts', 'last_day', 'last_active_day', 'run_length', 'max_streak']
+            )
+        return existing
+
+
+class StatsSnapshot(models.Model):
+    """Append-only history of a user's counters and rating.
+
+    A raw snapshot is written whenever update_stats changes one of FIELDS.
+    `manage.py compact_stats_history` later folds raw snapshots into one
+    row per UTC day and daily rows into one row per week (Monday), each
+    keeping the last values of its period, so storage grows with how
+    often users actually progress and stays bounded over the years.
+    """
+    RAW, DAILY, WEEKLY = 'r', 'd', 'w'
+    PERIOD_CHOICES = [(RAW, 'raw'), (DAILY, 'daily'), (WEEKLY, 'weekly')]
+
+    FIELDS = ('total_solved', 'easy_solved', 'medium_solved', 'hard_solved', 'ranking', 'contest_rating')
+
+    user = models.ForeignKey(TrackedUser, on_delete=models.CASCADE, related_name='snapshots')
+    period = models.CharField(max_length=1, choices=PERIOD_CHOICES, default=RAW)
+    taken_at = models.DateTimeField()
+    total_solved = models.PositiveSmallIntegerField(default=0)
+    easy_solved = models.PositiveSmallIntegerField(default=0)
+    medium_solved = models.PositiveSmallIntegerField(default=0)
+    hard_solved = models.PositiveSmallIntegerField(default=0)
+    ranking = models.IntegerField(null=True, blank=True)
+    contest_rating = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period', 'taken_at'], name='unique_stats_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'taken_at']),
+            models.Index(fields=['period', 'taken_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.taken_at:%Y-%m-%d %H:%M} ({self.get_period_display()})"
+
+    @classmethod
+    def is_tracked(cls, changes) -> bool:
+        return any(f in changes for f in cls.FIELDS)
+
+    @classmethod
+    def from_user(cls, user, taken_at=None):
+        return cls(
+            user=user, period=cls.RAW, taken_at=taken_at or timezone.now(),
+            **{f: getattr(user, f) for f in cls.FIELDS},
+        )
+
+    @classmethod
+    def compact(cls, now=None) -> dict:
+        """Fold raw snapshots past SNAPSHOT_RAW_DAYS into daily rows and daily rows
+        past SNAPSHOT_DAILY_DAYS into weekly rows. Returns rows removed per period.
+        """
+        now = now or timezone.now()
+        midnight = now.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        raw_cutoff = midnight - timedelta(days=getattr(settings, 'SNAPSHOT_RAW_DAYS', 7))
+        daily_cutoff = midnight - timedelta(days=getattr(settings, 'SNAPSHOT_DAILY_DAYS', 90))
+        # Weekly buckets start on Monday; only compact whole weeks
+        daily_cutoff -= timedelta(days=daily_cutoff.weekday())
+
+        def _day(ts):
+            return ts.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        def _week(ts):
+            day = _day(ts)
+            return day - timedelta(days=day.weekday())
+
+        return {
+            cls.RAW: cls._fold(cls.RAW, cls.DAILY, raw_cutoff, _day),
+            cls.DAILY: cls._fold(cls.DAILY, cls.WEEKLY, daily_cutoff, _week),
+        }
+
+    @classmethod
+    def _fold(cls, source, target, cutoff, bucket) -> int:
+        """Replace source rows older than cutoff with the last row of each (user, bucket)."""
+        rows = (
+            cls.objects.filter(period=source, taken_at__lt=cutoff)
+            .order_by('user_id', 'taken_at')
+            .values_list('id', 'user_id', 'taken_at', *cls.FIELDS)
+        )
+        removed = 0
+        latest, ids = {}, []
+
+        def _flush():
+            nonlocal removed
+            if not ids:
+                return
+            with transaction.atomic():
+                cls.objects.bulk_create(
+                    [
+                        cls(user_id=user_id, period=target, taken_at=start, **dict(zip(cls.FIELDS, values)))
+                        for (user_id, start), values in latest.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['user', 'period', 'taken_at'],
+                    update_fields=list(cls.FIELDS),
+                    batch_size=500,
+                )
+                for i in range(0, len(ids), 500):
+                    cls.objects.filter(id__in=ids[i:i + 500]).delete()
+            removed += len(ids)
+            latest.clear()
+            ids.clear()
+
+        previous_user = None
+        for pk, user_id, taken_at, *values in rows.iterator(chunk_size=2000):
+            # Flush between users so a (user, bucket) is never split across batches
+            if user_id != previous_user and len(ids) >= 5000:
+                _flush()
+            previous_user = user_id
+            latest[(user_id, bucket(taken_at))] = values
+            ids.append(pk)
+        _flush()
+        return removed
+
+    @classmethod
+    def series(cls, user, since=None, until=None, points=100) -> list:
+        """(taken_at, {field: value}) across all periods, oldest first, downsampled to at most points."""
+        qs = cls.objects.filter(user=user)
+        if since:
+            qs = qs.filter(taken_at__gte=since)
+        if until:
+            qs = qs.filter(taken_at__lte=until)
+        rows = list(qs.order_by('taken_at').values_list('taken_at', *cls.FIELDS))
+        if len(rows) > points > 0:
+            first, last = rows[0][0], rows[-1][0]
+            span = (last - first).total_seconds() or 1
+            buckets = {}
+            for row in rows:
+                buckets[min(points - 1, int((row[0] - first).total_seconds() / span * points))] = row
+            rows = [buckets[k] for k in sorted(buckets)]
+        return [(row[0], dict(zip(cls.FIELDS, row[1:]))) for row in rows]
+
+
+class ContestParticipation(models.Model):
+    """One contest attended by a tracked user.
+
+    Ingested from the upstream rating history; only contests newer than
+    TrackedUser.last_contest_at are parsed and inserted. rating_delta is
+    the change from the user's previous contest.
+    """
+    user = models.ForeignKey(TrackedUser, on_delete=models.CASCADE, related_name='contests')
+    title = models.CharField(max_length=255)
+    start_time = models.DateTimeField()
+    rating = models.FloatField()
+    rating_delta = models.FloatField(null=True, blank=True)
+    ranking = models.IntegerField(null=True, blank=True)
+    problems_solved = models.PositiveSmallIntegerField(default=0)
+    total_problems = models.PositiveSmallIntegerField(default=0)
+    finish_time_seconds = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['start_time']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'start_time'], name='unique_contest_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.title} ({self.rating:.0f})"
+
+    # TrackedUser fields written by ingest
+    AGGREGATE_FIELDS = (
+        'contests_attended', 'best_contest_rating', 'last_rating_delta', 'contest_percentile', 'last_contest_at',
+    )
+
+    @staticmethod
+    def _parse(entry: dict):
+        """(start_time, fields) for an attended history entry, or None"""
+        if not isinstance(entry, dict) or entry.get('attended') is False:
+            return None
+        contest = entry.get('contest') or {}
+        try:
+            start = int(contest.get('startTime') or entry.get('startTime'))
+            rating = float(entry.get('rating'))
+        except (ValueError, TypeError):
+            return None
+
+        def _int(value):
+            try:
+                return int(value)
+            except (ValueError, TypeError):
+                return None
+
+        return timezone.datetime.fromtimestamp(start, tz=dt_timezone.utc), {
+            'title': str(contest.get('title') or entry.get('title') or '')[:255],
+            'rating': rating,
+            'ranking': _int(entry.get('ranking')) or None,
+            'problems_solved': _int(entry.get('problemsSolved')) or 0,
+            'total_problems': _int(entry.get('totalProblems')) or 0,
+            'finish_time_seconds': _int(entry.get('finishTimeInSeconds')),
+        }
+
+    @classmethod
+    def ingest(cls, user, history, rating_changed=True) -> dict:
+        """Store contests newer than user.last_contest_at and refresh the aggregates.
+
+        Sets the TrackedUser aggregate fields without saving and returns
+        them as {field: (old, new)} for the ones that changed. The
+        percentile is only recomputed for new contests or a changed rating;
+        refresh_percentiles() catches up on everyone else's moves.
+        """
+        previous = {f: getattr(user, f) for f in cls.AGGREGATE_FIELDS}
+        parsed = sorted(
+            (p for p in (cls._parse(e) for e in history or []) if p),
+            key=lambda p: p[0],
+        )
+        new = [(start, fields) for start, fields in parsed if user.last_contest_at is None or start > user.last_contest_at]
+
+        if new:
+            last = cls.objects.filter(user=user).order_by('-start_time').values_list('rating', flat=True).first()
+            rows = []
+            for start, fields in new:
+                delta = round(fields['rating'] - last, 2) if last is not None else None
+                rows.append(cls(user=user, start_time=start, rating_delta=delta, **fields))
+                last = fields['rating']
+            cls.objects.bulk_create(rows, ignore_conflicts=True)
+
+            best = max(r.rating for r in rows)
+            user.best_contest_rating = max(best, user.best_contest_rating or best)
+            user.last_rating_delta = rows[-1].rating_delta
+            user.last_contest_at = rows[-1].start_time
+            user.contests_attended = cls.objects.filter(user=user).count()
+
+        if user.contest_rating is None:
+            user.contest_percentile = None
+        elif new or rating_changed or user.contest_percentile is None:
+            rated = TrackedUser.objects.filter(contest_rating__isnull=False).exclude(pk=user.pk)
+            total = rated.count() + 1
+            below = rated.filter(contest_rating__lt=user.contest_rating).count()
+            user.contest_percentile = round(100.0 * below / total, 2)
+
+        return {
+            f: (previous[f], getattr(user, f)) for f in cls.AGGREGATE_FIELDS if getattr(user, f) != previous[f]
+        }
+
+    @classmethod
+    def refresh_percentiles(cls) -> int:
+        """Recompute contest_percentile for every rated user in one pass; returns rows updated."""
+        rows = list(
+            TrackedUser.objects.filter(contest_rating__isnull=False)
+            .order_by('contest_rating').values_list('pk', 'contest_rating', 'contest_percentile')
+        )
+        total = len(rows)
+        changed, below, previous_rating = [], 0, None
+        for position, (pk, rating, percentile) in enumerate(rows):
+            if rating != previous_rating:
+                below, previous_rating = position, rating
+            value = round(100.0 * below / total, 2)
+            if value != percentile:
+                changed.append(TrackedUser(pk=pk, contest_percentile=value))
+        TrackedUser.objects.bulk_update(changed, ['contest_percentile'], batch_size=500)
+        return len(changed)
@@ -0,0 +1,180 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+
+from .models import LeaderboardEntry, TrackedUser
+
+# How far behind the watermark each incremental sync looks again
+_SYNC_OVERLAP = timedelta(seconds=30)
+
+# Sorts after any username, for bisecting past all keys with the same value
+_MAX_USERNAME = chr(0x10FFFF)
+
+
+class RankIndex:
+    """In-process order-statistics index over the LeaderboardEntry rows of each category.
+
+    Each category keeps a sorted list of (-value, username) keys, so a
+    user's rank and neighbors are found by binary search. The index is
+    built from the table on first use and then kept current by re-reading
+    the entries of users whose last_updated moved past the last sync
+    (update_stats stamps last_updated whenever a stat changes), at most
+    once every RANK_INDEX_SYNC_INTERVAL seconds. A background thread
+    rebuilds it every RANK_INDEX_REBUILD_INTERVAL seconds to pick up
+    deleted users, so no request pays for a full rebuild after the first.
+
+    Ranks and totals match LeaderboardEntry: rank is 1 + number of users
+    with a higher value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._keys = {}      # category -> sorted [(-value, username)]
+        self._values = {}    # category -> {username: value}
+        self._names = {}     # username -> display name
+        self._by_lower = {}  # lowercased username -> username
+        self._watermark = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self._thread = None
+
+    @property
+    def sync_interval(self):
+        return getattr(settings, 'RANK_INDEX_SYNC_INTERVAL', 5)
+
+    @property
+    def rebuild_interval(self):
+        return getattr(settings, 'RANK_INDEX_REBUILD_INTERVAL', 600)
+
+    @staticmethod
+    def _entries(user_ids=None) -> dict:
+        """{user_id: {category: value}} from LeaderboardEntry, optionally for some users only."""
+        qs = LeaderboardEntry.objects.order_by()
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+        entries = {}
+        for user_id, category, value in qs.values_list('user_id', 'category', 'value').iterator():
+            entries.setdefault(user_id, {})[category] = value
+        return entries
+
+    def _rebuild(self):
+        """Read the whole leaderboard and swap it in (takes the lock only for the swap)."""
+        keys = {c: [] for c in LeaderboardEntry.CATEGORIES}
+        values = {c: {} for c in LeaderboardEntry.CATEGORIES}
+        names, by_lower, watermark = {}, {}, None
+        users = TrackedUser.objects.order_by().values_list('pk', 'username', 'display_name', 'last_updated')
+        entries = self._entries()
+        for pk, username, display_name, last_updated in users.iterator():
+            names[username] = display_name or username
+            by_lower[username.lower()] = username
+            if watermark is None or last_updated > watermark:
+                watermark = last_updated
+            for category, value in entries.get(pk, {}).items():
+                values[category][username] = value
+                keys[category].append((-value, username))
+        for category_keys in keys.values():
+            category_keys.sort()
+        with self._lock:
+            self._keys, self._values, self._names, self._by_lower = keys, values, names, by_lower
+            self._watermark = watermark
+            self._built_at = self._synced_at = time.monotonic()
+
+    def _ensure_rebuilding(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='rank-index-rebuild', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self.rebuild_interval, 1))
+            try:
+                self._rebuild()
+            except Exception:
+                pass
+            finally:
+                connection.close()
+
+    def _apply(self, username, display_name, entry_values):
+        self._names[username] = display_name or username
+        self._by_lower[username.lower()] = username
+        for category in LeaderboardEntry.CATEGORIES:
+            keys, values = self._keys[category], self._values[category]
+            old, new = values.get(username), entry_values.get(category)
+            if old == new:
+                continue
+            if old is not None:
+                i = bisect_left(keys, (-old, username))
+                if i < len(keys) and keys[i] == (-old, username):
+                    del keys[i]
+                del values[username]
+            if new is not None:
+                insort(keys, (-new, username))
+                values[username] = new
+
+    def _sync(self):
+        """Bring the index up to date; called with the lock held."""
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        qs = TrackedUser.objects.order_by()
+        if self._watermark is not None:
+            # Re-read a short overlap so rows committed late by another
+            # worker with an older timestamp are not missed; re-applying an
+            # unchanged row is a no-op
+            qs = qs.filter(last_updated__gte=self._watermark - _SYNC_OVERLAP)
+        users = list(qs.values_list('pk', 'username', 'display_name', 'last_updated'))
+        entries = self._entries([pk for pk, _, _, _ in users])
+        for pk, username, display_name, last_updated in users:
+            self._apply(username, display_name, entries.get(pk, {}))
+            if self._watermark is None or last_updated > self._watermark:
+                self._watermark = last_updated
+
+    def _row(self, category, key):
+        value, username = -key[0], key[1]
+        return {
+            'rank': bisect_left(self._keys[category], (key[0],)) + 1,
+            'username': username,
+            'display_name': self._names.get(username, username),
+            'value': value,
+        }
+
+    def neighborhood(self, category: str, username: str, neighbors: int = 5):
+        """Rank, percentile and up to `neighbors` users above and below username, or None."""
+        if not self._built_at:
+            # Only the first lookup builds the index inline
+            with self._build_lock:
+                if not self._built_at:
+                    self._rebuild()
+                    self._ensure_rebuilding()
+        with self._lock:
+            self._sync()
+            values = self._values[category]
+            username = self._by_lower.get(username.lower(), username)
+            if username not in values:
+                return None
+
+            keys = self._keys[category]
+            key = (-values[username], username)
+            pos = bisect_left(keys, key)
+            me = self._row(category, key)
+            total = len(keys)
+            users_below = total - bisect_left(keys, (key[0], _MAX_USERNAME))
+            return {
+                'category': category,
+                'total': total,
+                'rank': me['rank'],
+                'percentile': round(100.0 * users_below / total, 2) if total else 0.0,
+                'user': me,
+                'above': [self._row(category, k) for k in keys[max(0, pos - neighbors):pos]],
+                'below': [self._row(category, k) for k in keys[pos + 1:pos + 1 + neighbors]],
+            }
+
+
+rank_index = RankIndex()
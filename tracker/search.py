@@ -0,0 +1,193 @@
+"""
+Username / display name search backed by an SQLite FTS5 trigram index.
+
+tracker_trackeduser_fts is an external-content FTS5 table over
+TrackedUser.username and display_name, kept in sync by triggers. The
+trigram tokenizer answers substring queries of 3+ characters from the
+index, and trigram overlap gives typo-tolerant (fuzzy) matches. Other
+database backends, and queries shorter than 3 characters, fall back to
+LIKE lookups.
+"""
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import TrackedUser
+
+FTS_TABLE = 'tracker_trackeduser_fts'
+USER_TABLE = 'tracker_trackeduser'
+
+_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF username, display_name ON {USER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+            INSERT INTO {FTS_TABLE}(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END""",
+}
+
+# Minimum trigram similarity (Jaccard) for a fuzzy suggestion
+FUZZY_THRESHOLD = 0.3
+
+# Database aliases known to have the FTS table
+_available = {}
+
+
+def ensure_search_index(connection, rebuild=False):
+    """Create the FTS table and its triggers if missing (SQLite only).
+
+    The index is rebuilt from TrackedUser when anything had to be created:
+    table rebuilds during later migrations drop the triggers with the old
+    table, so rows written in between would otherwise be missing.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+            [FTS_TABLE, USER_TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = ({FTS_TABLE} | set(_TRIGGERS)) - existing
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"username, display_name, content='{USER_TABLE}', content_rowid='id', tokenize='trigram')"
+        )
+        for sql in _TRIGGERS.values():
+            cursor.execute(sql)
+        if missing or rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _available.pop(connection.alias, None)
+
+
+def fts_available(using=DEFAULT_DB_ALIAS) -> bool:
+    if using not in _available:
+        connection = connections[using]
+        ok = False
+        if connection.vendor == 'sqlite':
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+                    ok = cursor.fetchone() is not None
+            except OperationalError:
+                ok = False
+        _available[using] = ok
+    return _available[using]
+
+
+def _phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase (a substring match under trigram)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(text: str) -> set:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(text: str) -> set:
+    """Trigrams with word-boundary padding (as pg_trgm), used for similarity scoring"""
+    return _trigrams('  ' + text + ' ')
+
+
+def _similarity(a: str, b: str) -> float:
+    ta, tb = _padded_trigrams(a), _padded_trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+
+
+def filter_users(queryset, query: str):
+    """Restrict a TrackedUser queryset to rows whose username or display name contains query"""
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    if len(query) >= 3 and fts_available(queryset.db):
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_phrase(query)]
+        ))
+    return queryset.filter(Q(username__icontains=query) | Q(display_name__icontains=query))
+
+
+def suggest_users(query: str, limit: int = 8) -> list:
+    """Ranked TrackedUser matches for typeahead.
+
+    Exact username matches come first, then username prefixes, display
+    name prefixes and other substring matches (each by view count), and
+    finally fuzzy matches by trigram similarity when there is room left.
+    """
+    query = (query or '').strip()
+    if not query or limit <= 0:
+        return []
+
+    if not fts_available():
+        return list(
+            TrackedUser.objects.filter(Q(username__istartswith=query) | Q(display_name__istartswith=query))
+            .order_by('-view_count', 'username')[:limit]
+        )
+
+    if len(query) < 3:
+        # Too short for trigrams: username prefix ranges on the unique index
+        # for the usual casings (a LIKE here would scan the table)
+        prefixes = Q()
+        for variant in {query, query.lower(), query.upper(), query.capitalize()}:
+            prefixes |= Q(username__gte=variant, username__lt=variant + '\U0010ffff')
+        return list(TrackedUser.objects.filter(prefixes).order_by('-view_count', 'username')[:limit])
+
+    lowered = query.lower()
+    like_prefix = lowered.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT u.id FROM {FTS_TABLE} f JOIN {USER_TABLE} u ON u.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY CASE
+                WHEN lower(u.username) = %s THEN 0
+                WHEN lower(u.username) LIKE %s ESCAPE '\\' THEN 1
+                WHEN lower(u.display_name) LIKE %s ESCAPE '\\' THEN 2
+                ELSE 3 END,
+                u.view_count DESC, u.username
+            LIMIT %s
+            """,
+            [_phrase(query), lowered, like_prefix, like_prefix, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+        if len(ids) < limit:
+            fuzzy = ' OR '.join(_phrase(t) for t in sorted(_trigrams(query)))
+            cursor.execute(
+                f"SELECT rowid, username, display_name FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY rank LIMIT %s",
+                [fuzzy, limit * 5],
+            )
+            scored = []
+            for pk, username, display_name in cursor.fetchall():
+                if pk in ids:
+                    continue
+                best = max(_similarity(query, username), _similarity(query, display_name or ''))
+                if best >= FUZZY_THRESHOLD:
+                    scored.append((-best, pk))
+            ids += [pk for _, pk in sorted(scored)[:limit - len(ids)]]
+
+    users = TrackedUser.objects.in_bulk(ids)
+    return [users[pk] for pk in ids if pk in users]
+
+
+def ensure_search_index_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate hook: restore triggers dropped by table rebuilds in later migrations"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    _available.pop(using, None)
+    if fts_available(using):
+        ensure_search_index(connection)
@@ -1,3 +1,231 @@
-from django.test import TestCase
+import json
+import random
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .activity import streaks_from_days, today_day
+from .models import LeaderboardEntry, TrackedUser, UserActivity
+from .rank_index import RankIndex
+
+
+def random_stats(rng):
+    return {
+        'display_name': 'x',
+        'total_solved': rng.randint(0, 20),
+        'easy': rng.randint(0, 5),
+        'medium': rng.randint(0, 5),
+        'hard': rng.randint(0, 3),
+        'contest_rating': rng.choice(['N/A', 1400, 1500, 1600.5]),
+        'current_streak': rng.randint(0, 4),
+    }
+
+
+def board():
+    return sorted(LeaderboardEntry.objects.values_list('category', 'user_id', 'value', 'rank'))
+
+
+class LeaderboardSyncTests(TestCase):
+    def setUp(self):
+        cache.delete(LeaderboardEntry.STALE_KEY)
+        self.rng = random.Random(1)
+        self.users = [TrackedUser.objects.create(username=f'u{i}') for i in range(40)]
+
+    def test_incremental_ranks_match_rebuild(self):
+        for _ in range(300):
+            user = self.rng.choice(self.users)
+            user.refresh_from_db()
+            user.update_stats(random_stats(self.rng))
+
+        incremental = board()
+        LeaderboardEntry.rebuild()
+        self.assertTrue(incremental)
+        self.assertEqual(incremental, board())
+
+    def test_created_users_get_entries(self):
+        TrackedUser.store_stats_many([('fresh', {'username': 'fresh', 'display_name': 'fresh'}, None, None)])
+        user = TrackedUser.objects.create(username='rated', contest_rating=1500.0)
+
+        self.assertEqual(LeaderboardEntry.objects.filter(category='total').count(), 42)
+        self.assertEqual(LeaderboardEntry.objects.get(category='contest').user, user)
+        incremental = board()
+        LeaderboardEntry.rebuild()
+        self.assertEqual(incremental, board())
+
+    def test_deleted_users_shift_ranks(self):
+        for user in self.users:
+            user.update_stats(random_stats(self.rng))
+        top = LeaderboardEntry.objects.filter(category='total').order_by('rank').first().user
+        top.delete()
+        TrackedUser.objects.filter(username__in=['u5', 'u6']).delete()
+
+        self.assertEqual(LeaderboardEntry.objects.filter(category='total').count(), 37)
+        incremental = board()
+        LeaderboardEntry.rebuild()
+        self.assertEqual(incremental, board())
+
+    def test_failed_sync_is_logged_and_rebuilt(self):
+        for user in self.users:
+            user.update_stats(random_stats(self.rng))
+
+        user = self.users[0]
+        with mock.patch.object(LeaderboardEntry, 'sync_user', side_effect=RuntimeError('boom')), \
+                self.assertLogs('tracker.models', 'ERROR'), \
+                self.captureOnCommitCallbacks() as callbacks:
+            user.update_stats(dict(random_stats(self.rng), total_solved=500))
+        self.assertIn('total', cache.get(LeaderboardEntry.STALE_KEY))
+        self.assertNotEqual(LeaderboardEntry.objects.get(category='total', user=user).value, 500)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(LeaderboardEntry.objects.get(category='total', user=user).rank, 1)
+        self.assertEqual(cache.get(LeaderboardEntry.STALE_KEY), [])
+        incremental = board()
+        LeaderboardEntry.rebuild()
+        self.assertEqual(incremental, board())
+
+
+@override_settings(RANK_INDEX_SYNC_INTERVAL=0)
+class RankIndexTests(TestCase):
+    def test_neighborhood_matches_leaderboard(self):
+        rng = random.Random(2)
+        users = [TrackedUser.objects.create(username=f'U{i}') for i in range(25)]
+        for user in users:
+            user.update_stats(random_stats(rng))
+
+        index = RankIndex()
+        for _ in range(100):
+            user = rng.choice(users)
+            user.refresh_from_db()
+            user.update_stats(random_stats(rng))
+            for category in LeaderboardEntry.CATEGORIES:
+                entries = LeaderboardEntry.objects.filter(category=category).select_related('user')
+                for entry in entries:
+                    found = index.neighborhood(category, entry.user.username.lower(), 0)
+                    self.assertIsNotNone(found)
+                    self.assertEqual(found['rank'], entry.rank)
+                    self.assertEqual(found['total'], len(entries))
+        self.assertIsNone(index.neighborhood('total', 'nobody'))
+
+    def test_index_covers_the_leaderboard_rows(self):
+        users = [TrackedUser.objects.create(username=f'U{i}', total_solved=i) for i in range(10)]
+        # A user without entries (e.g. its sync failed and is waiting for
+        # the rebuild) is left out of the index just like out of api_leaderboard
+        LeaderboardEntry.remove_user(users[9])
+
+        index = RankIndex()
+        self.assertIsNone(index.neighborhood('total', 'U9'))
+        found = index.neighborhood('total', 'U8', 0)
+        self.assertEqual(found['total'], LeaderboardEntry.objects.filter(category='total').count())
+        self.assertEqual(found['rank'], LeaderboardEntry.objects.get(category='total', user=users[8]).rank)
+
+
+class UserActivityMergeTests(TestCase):
+    def test_incremental_merge_matches_full_history(self):
+        rng = random.Random(3)
+        today = today_day()
+        history = {day: rng.randint(1, 4) for day in range(today - 600, today + 1) if rng.random() < 0.7}
+        user = TrackedUser.objects.create(username='alice')
+
+        # Refreshes every few days, each seeing the trailing year up to that
+        # day, with that day's count still growing
+        cutoff = today - 400
+        while True:
+            calendar = {
+                str(day * 86400): (1 if day == cutoff else count)
+                for day, count in history.items() if cutoff - 365 <= day <= cutoff
+            }
+            user.update_stats({'display_name': 'A', 'total_solved': cutoff}, calendar=json.dumps(calendar))
+            if cutoff == today:
+                break
+            cutoff = min(today, cutoff + rng.randint(1, 9))
+        # The last refresh sees the final count for today
+        final = {str(day * 86400): count for day, count in history.items() if day >= today - 365}
+        user.update_stats({'display_name': 'A', 'total_solved': today + 1}, calendar=json.dumps(final))
+
+        activity = UserActivity.objects.get(user=user)
+        current, longest = streaks_from_days(history, today)
+        self.assertEqual((activity.current_streak(today), activity.max_streak), (current, longest))
+        user.refresh_from_db()
+        self.assertEqual((user.current_streak, user.max_streak), (current, longest))
+
+        counts = activity.get_counts()
+        stored = {activity.start_day + i: c for i, c in enumerate(counts) if c}
+        self.assertEqual(stored, {day: count for day, count in history.items() if day >= activity.start_day})
+
+
+class UserListCursorTests(TestCase):
+    def setUp(self):
+        rng = random.Random(4)
+        for i in range(23):
+            TrackedUser.objects.create(
+                username=f'c{i}',
+                view_count=rng.randint(0, 3),
+                total_solved=rng.choice([0, 5, 5, 10]),
+                contest_rating=rng.choice([None, None, 1500.0, 1612.5]),
+            )
+
+    def walk(self, sort, limit):
+        usernames, cursor = [], ''
+        while True:
+            response = self.client.get('/api/users/', {'sort': sort, 'limit': limit, 'fields': 'username', 'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            usernames += [u['username'] for u in data['users']]
+            cursor = data['next_cursor']
+            if not cursor:
+                return usernames
+
+    def test_pages_cover_every_user_once_in_order(self):
+        for sort, field in [('views', 'view_count'), ('solved', 'total_solved'), ('rating', 'contest_rating')]:
+            rows = TrackedUser.objects.values_list(field, 'pk', 'username')
+            # Descending by key with NULLs last, ties broken by descending id
+            expected = [name for _, _, name in sorted(rows, key=lambda r: (r[0] is None, -(r[0] or 0), -r[1]))]
+            for limit in (1, 4, 7):
+                with self.subTest(sort=sort, limit=limit):
+                    self.assertEqual(self.walk(sort, limit), expected)
+
+    def test_recent_sort_round_trips(self):
+        TrackedUser.objects.filter(username__in=['c1', 'c2', 'c3']).update(last_submission=timezone.now())
+        usernames = self.walk('recent', 4)
+        self.assertEqual(sorted(usernames), sorted(TrackedUser.objects.values_list('username', flat=True)))
+        self.assertEqual(usernames[:3], ['c3', 'c2', 'c1'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/users/', {'cursor': '!!'}).status_code, 400)
+
+
+class LastSubmissionsTests(TestCase):
+    def test_batched_get(self):
+        TrackedUser.objects.create(username='alice', recent_submissions=[{'title': 'Two Sum', 'timestamp': 1}])
+        TrackedUser.objects.create(username='bob')
+
+        response = self.client.get('/api/users/last-submissions/', {'usernames': 'alice, bob,nobody'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], {
+            'alice': {'title': 'Two Sum', 'timestamp': 1}, 'bob': None, 'nobody': None,
+        })
+        self.assertEqual(self.client.get('/api/users/last-submissions/').status_code, 400)
+        self.assertEqual(self.client.post('/api/users/last-submissions/?usernames=alice').status_code, 405)
+
+
+class RefreshCommandTests(TestCase):
+    def test_due_batches_walk_each_due_user_once(self):
+        from .management.commands.refresh_tracked_users import Command
+
+        now = timezone.now()
+        old = now - timedelta(hours=2)
+        for i, last_fetched in enumerate([None, old, None, old, now, old - timedelta(hours=1), None]):
+            TrackedUser.objects.create(username=f'r{i}', last_fetched=last_fetched, view_count=i)
+
+        command = Command()
+        command.refreshed_at = {'r3': time.time()}
+        batches = list(command.due_batches(600, 2))
+
+        # Never fetched first, then oldest, in (last_fetched, id) pages of
+        # two, each page most viewed first; r4 is fresh, r3 just refreshed
+        self.assertEqual(batches, [['r2', 'r0'], ['r6'], ['r5', 'r1']])
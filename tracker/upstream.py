@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    fcntl = None
+
+
+class UpstreamUnavailable(Exception):
+    """No upstream answered: every request was skipped or failed in transit."""
+
+
+class UpstreamGuard:
+    """Per-host token-bucket rate limiter and circuit breaker.
+
+    State lives in one small JSON file per host under UPSTREAM_STATE_DIR and
+    is updated under an exclusive flock, so every gunicorn worker on a node
+    shares the same buckets and breakers. Each operation is a few
+    microseconds of local file I/O, but can block on the lock, so async
+    callers run it in a worker thread. Without fcntl (non-POSIX) the state
+    is kept per process instead.
+
+    A host's breaker opens after UPSTREAM_BREAKER_THRESHOLD consecutive
+    failures (429, 5xx, timeouts, connection errors) and skips the host for
+    UPSTREAM_BREAKER_COOLDOWN seconds. After the cooldown a single trial
+    request is let through; its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self):
+        self._local_state = {}
+        self._local_lock = threading.Lock()
+
+    @property
+    def state_dir(self):
+        return getattr(settings, 'UPSTREAM_STATE_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'leetcode_tracker_upstream'
+        )
+
+    @staticmethod
+    def _default_state():
+        return {'tokens': None, 'updated': 0.0, 'failures': 0, 'open_until': 0.0}
+
+    @contextmanager
+    def _state(self, host: str):
+        """Yield the mutable state dict for host, persisting it on exit."""
+        if fcntl is None:
+            with self._local_lock:
+                state = self._local_state.setdefault(host, self._default_state())
+                yield state
+            return
+
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = os.path.join(self.state_dir, host.replace(os.sep, '_') + '.json')
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            try:
+                state = dict(self._default_state(), **json.loads(raw.decode('utf-8')))
+            except Exception:
+                state = self._default_state()
+            yield state
+            data = json.dumps(state).encode('utf-8')
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def acquire(self, host: str) -> bool:
+        """Return True if a request to host may be sent now (consumes one token)."""
+        rate = float(getattr(settings, 'UPSTREAM_RATE_LIMIT', 10))
+        burst = float(getattr(settings, 'UPSTREAM_RATE_BURST', 20))
+        cooldown = float(getattr(settings, 'UPSTREAM_BREAKER_COOLDOWN', 60))
+
+        try:
+            with self._state(host) as state:
+                now = time.time()
+                if state['open_until']:
+                    if now < state['open_until']:
+                        return False
+                    # Half-open: let this request through as the trial and
+                    # keep skipping the host until it reports back.
+                    state['open_until'] = now + cooldown
+
+                tokens = burst if state['tokens'] is None else state['tokens']
+                tokens = min(burst, tokens + (now - state['updated']) * rate)
+                state['updated'] = now
+                if tokens < 1:
+                    state['tokens'] = tokens
+                    return False
+                state['tokens'] = tokens - 1
+                return True
+        except OSError:
+            # Never block upstream traffic because the state file is unusable
+            return True
+
+    def record_success(self, host: str):
+        try:
+            with self._state(host) as state:
+                state['failures'] = 0
+                state['open_until'] = 0.0
+        except OSError:
+            pass
+
+    def record_failure(self, host: str):
+        threshold = int(getattr(settings, 'UPSTREAM_BREAKER_THRESHOLD', 5))
+        cooldown = float(getattr(settings, 'UPSTREAM_BREAKER_COOLDOWN', 60))
+        try:
+            with self._state(host) as state:
+                state['failures'] += 1
+                if state['failures'] >= threshold:
+                    state['open_until'] = time.time() + cooldown
+        except OSError:
+            pass
+
+
+upstream_guard = UpstreamGuard()
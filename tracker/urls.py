@@ -1,17 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'tracker'
 
+# Views that wait on the upstream APIs have async-native versions for ASGI
+# deployments (TRACKER_ASYNC_VIEWS=True).
+if getattr(settings, 'TRACKER_ASYNC_VIEWS', False):
+    from . import views_async as upstream_views
+else:
+    upstream_views = views
+
 urlpatterns = [
     path('', views.home, name='home'),
-    path('profile/<str:username>/', views.profile, name='profile'),
+    path('home/cards/', views.home_cards, name='home_cards'),
+    path('profile/<str:username>/', upstream_views.profile, name='profile'),
     
     # API endpoints
-    path('api/user/<str:username>/', views.api_user_data, name='api_user_data'),
-    path('api/users/data/', views.api_user_data_multi, name='api_user_data_multi'),
+    path('api/user/<str:username>/', upstream_views.api_user_data, name='api_user_data'),
+    path('api/user/<str:username>/activity/', views.api_user_activity, name='api_user_activity'),
+    path('api/user/<str:username>/history/', views.api_users_history, name='api_user_history'),
+    path('api/users/history/', views.api_users_history, name='api_users_history'),
+    path('api/user/<str:username>/contests/', views.api_user_contests, name='api_user_contests'),
+    path('api/users/data/', upstream_views.api_user_data_multi, name='api_user_data_multi'),
     path('api/users/', views.api_users_list, name='api_users_list'),
-    path('profiles/', views.profiles, name='profiles'),
+    path('api/users/last-submissions/', views.api_last_submissions, name='api_last_submissions'),
+    path('api/users/search/', views.api_users_search, name='api_users_search'),
+    path('profiles/', upstream_views.profiles, name='profiles'),
     path('api/leaderboard/', views.api_leaderboard, name='api_leaderboard'),
+    path('api/leaderboard/rank/<str:username>/', views.api_leaderboard_rank, name='api_leaderboard_rank'),
     path('api/debug/<str:username>/', views.api_debug_raw, name='api_debug_raw'),
 ]
\ No newline at end of file
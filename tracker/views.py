@@ -1,278 +1,347 @@
 import asyncio
 import aiohttp
+import base64
 import json
 import re
-from urllib.parse import quote
+import time
+from urllib.parse import quote, urlparse
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.db.models import Q
-from datetime import datetime, timedelta
-from .models import TrackedUser
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.core.cache import cache
+from django.db.models import DateTimeField, F, Q
+from django.db.models.functions import Coalesce, Lower
+from datetime import datetime, timedelta, timezone as dt_timezone
+from .activity import calculate_streaks, today_day
+from .cache import normalize_username, page_cache, raw_cache, stats_cache
+from .counters import view_counter
+from .http_client import shared_client
+from .rank_index import rank_index
+from .search import filter_users, suggest_users
+from .models import LeaderboardEntry, StatsSnapshot, TrackedUser, UserActivity
+from .upstream import UpstreamUnavailable, upstream_guard
 
 
 class LeetCodeAPI:
     TIMEOUT = 30
+    GRAPHQL_URL = "https://leetcode.com/graphql"
+    HEADERS = {
+        'User-Agent': 'LeetCode-Tracker/1.0',
+        'Referer': 'https://leetcode.com'
+    }
 
     @staticmethod
-    async def fetch_user_data(username: str):
-        """Fetch comprehensive user data from LeetCode API"""
-        timeout = aiohttp.ClientTimeout(total=LeetCodeAPI.TIMEOUT)
-        
-        profile_data = None
-        submissions_data = None
-        contest_data = None
-        api_used = None
-        
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            # ===== FETCH PROFILE DATA =====
-            # URL-encode username for inclusion in REST endpoints (prevents spaces/special-char issues)
-            safe_username = quote(username, safe='')
-
-            profile_endpoints = [
-                f"https://leetcode-stats-api.herokuapp.com/{safe_username}",
-                f"https://alfa-leetcode-api.onrender.com/userProfile/{safe_username}",
-                f"https://alfa-leetcode-api.onrender.com/{safe_username}",
-            ]
-            
-            for endpoint in profile_endpoints:
-                try:
-                    async with session.get(endpoint, timeout=aiohttp.ClientTimeout(total=20), headers={
-                        'User-Agent': 'LeetCode-Tracker/1.0',
-                        'Referer': 'https://leetcode.com'
-                    }) as response:
-                        if response.status == 200:
-                            profile_data = await response.json()
-                            api_used = endpoint
-                            break
-                except Exception:
-                    continue
-
-            # If REST profile endpoints failed, try GraphQL profile fallback
-            if not profile_data:
-                try:
-                    graphql_profile_query = {
-                        "query": """
-                            query userProfile($username: String!) {
-                                matchedUser(username: $username) {
-                                    username
-                                    profile {
-                                        realName
-                                        userAvatar
-                                    }
-                                    submitStats {
-                                        acSubmissionNum {
-                                            difficulty
-                                            count
-                                        }
-                                    }
-                                    submissionCalendar
-                                    reputation
-                                    ranking
-                                }
-                            }
-                        """,
-                        "variables": {"username": username}
-                    }
+    async def fetch_user_data(username: str, hedged: bool = None, use_cache: bool = True):
+        """Fetch comprehensive user data from LeetCode API.
+
+        The profile, submissions and contest phases run concurrently; the
+        submissions and contest results are discarded if the profile lookup
+        fails. With hedged=True (default: settings.UPSTREAM_HEDGED_FETCH)
+        every fallback endpoint of a phase is raced and the losers are
+        cancelled as soon as one succeeds. Unless use_cache is False, each
+        phase is served from the raw response cache while its TTL lasts.
+        """
+        # All upstream calls go through the shared loop and its pooled session
+        if not shared_client.in_client_loop():
+            return await shared_client.run_async(LeetCodeAPI.fetch_user_data(username, hedged, use_cache))
+
+        session = await shared_client.get_session()
+        if hedged is None:
+            hedged = getattr(settings, 'UPSTREAM_HEDGED_FETCH', False)
+
+        # URL-encode username for inclusion in REST endpoints (prevents spaces/special-char issues)
+        safe_username = quote(username, safe='')
+
+        async def cached(kind, fetch, is_hit=lambda payload: payload is not None):
+            if use_cache:
+                payload = raw_cache.get(kind, username)
+                if payload is not None:
+                    return payload
+            payload = await fetch()
+            if is_hit(payload):
+                raw_cache.set(kind, username, payload)
+            return payload
+
+        profile_task = asyncio.ensure_future(cached(
+            'profile',
+            lambda: LeetCodeAPI._fetch_profile(session, username, safe_username, hedged),
+            is_hit=lambda payload: bool(payload and payload[0]),
+        ))
+        submissions_task = asyncio.ensure_future(cached(
+            'submissions',
+            lambda: LeetCodeAPI._fetch_submissions(session, username, safe_username, hedged),
+        ))
+        contest_task = asyncio.ensure_future(cached(
+            'contest',
+            lambda: LeetCodeAPI._fetch_contest(session, safe_username, hedged),
+        ))
 
-                    headers = {
-                        'Content-Type': 'application/json',
-                        'Referer': 'https://leetcode.com',
-                        'User-Agent': 'LeetCode-Tracker/1.0'
-                    }
-
-                    async with session.post(
-                        "https://leetcode.com/graphql",
-                        json=graphql_profile_query,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=15)
-                    ) as gql_resp:
-                        if gql_resp.status == 200:
-                            gql_data = await gql_resp.json()
-                            m = (gql_data.get('data') or {}).get('matchedUser')
-                            if m:
-                                # Build a normalized profile_data dict similar to other endpoints
-                                prof = {}
-                                prof['username'] = m.get('username')
-                                prof['name'] = (m.get('profile') or {}).get('realName')
-                                # derive counts from submitStats.acSubmissionNum
-                                easy = 0
-                                medium = 0
-                                hard = 0
-                                total = 0
-                                ss = (m.get('submitStats') or {}).get('acSubmissionNum') or []
-                                for item in ss:
-                                    diff = (item.get('difficulty') or '').lower()
-                                    cnt = int(item.get('count') or 0)
-                                    if diff == 'all':
-                                        total = cnt
-                                    elif diff == 'easy':
-                                        easy = cnt
-                                    elif diff == 'medium':
-                                        medium = cnt
-                                    elif diff == 'hard':
-                                        hard = cnt
-                                prof['totalSolved'] = total or (easy + medium + hard)
-                                prof['easySolved'] = easy
-                                prof['mediumSolved'] = medium
-                                prof['hardSolved'] = hard
-                                prof['submissionCalendar'] = m.get('submissionCalendar')
-                                prof['ranking'] = m.get('ranking')
-                                profile_data = prof
-                                api_used = 'graphql_profile'
-                except Exception:
-                    # ignore and fall through to final not-found
-                    profile_data = None
-
-            if not profile_data:
-                return {"error": f"User '{username}' not found", "username": username}
-            
-            # ===== FETCH RECENT SUBMISSIONS =====
-            submission_endpoints = [
-                f"https://alfa-leetcode-api.onrender.com/{safe_username}/submission",
-                f"https://alfa-leetcode-api.onrender.com/{safe_username}/acSubmission",
-            ]
-            
-            for sub_endpoint in submission_endpoints:
-                try:
-                    async with session.get(sub_endpoint, timeout=aiohttp.ClientTimeout(total=20), headers={
-                        'User-Agent': 'LeetCode-Tracker/1.0',
-                        'Referer': 'https://leetcode.com'
-                    }) as sub_response:
-                        if sub_response.status == 200:
-                            temp_data = await sub_response.json()
-                            if temp_data and isinstance(temp_data, dict) and 'submission' in temp_data:
-                                submissions_data = temp_data
-                                break
-                            elif temp_data and isinstance(temp_data, list) and len(temp_data) > 0:
-                                submissions_data = {'submission': temp_data}
-                                break
-                except Exception:
-                    continue
-            
-            # GraphQL fallback for submissions
-            if not submissions_data:
-                try:
-                    graphql_query = {
-                        "query": """
-                            query recentSubmissions($username: String!, $limit: Int!) {
-                                recentSubmissionList(username: $username, limit: $limit) {
-                                    title
-                                    titleSlug
-                                    timestamp
-                                    statusDisplay
-                                    lang
-                                }
-                            }
-                        """,
-                        "variables": {"username": username, "limit": 20}
-                    }
-                    
-                    headers = {
-                        'Content-Type': 'application/json',
-                        'Referer': 'https://leetcode.com',
-                        'User-Agent': 'LeetCode-Tracker/1.0'
-                    }
-                    
-                    async with session.post(
-                        "https://leetcode.com/graphql",
-                        json=graphql_query,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=15)
-                    ) as graphql_response:
-                        if graphql_response.status == 200:
-                            graphql_data = await graphql_response.json()
-                            if 'data' in graphql_data and 'recentSubmissionList' in graphql_data['data']:
-                                submissions_data = {
-                                    'submission': graphql_data['data']['recentSubmissionList']
-                                }
-                except Exception as e:
-                    pass
-            
-            # ===== FETCH CONTEST DATA =====
-            contest_endpoints = [
-                f"https://alfa-leetcode-api.onrender.com/userContestRankingInfo/{safe_username}",
-                f"https://alfa-leetcode-api.onrender.com/{safe_username}/contest",
-            ]
-            
-            for contest_endpoint in contest_endpoints:
-                try:
-                    async with session.get(contest_endpoint, timeout=aiohttp.ClientTimeout(total=15), headers={
-                        'User-Agent': 'LeetCode-Tracker/1.0',
-                        'Referer': 'https://leetcode.com'
-                    }) as contest_response:
-                        if contest_response.status == 200:
-                            temp_contest_data = await contest_response.json()
-                            if temp_contest_data and isinstance(temp_contest_data, dict):
-                                # Accept contest data if it has expected keys or is non-empty
-                                contest_data = temp_contest_data
-                                break
-                except Exception as e:
-                    continue
-            
+        try:
+            profile_data, api_used = await profile_task
+        except UpstreamUnavailable:
+            submissions_task.cancel()
+            contest_task.cancel()
             return {
+                "error": "LeetCode is unavailable right now, please try again later",
                 "username": username,
-                "profile": profile_data,
-                "submissions": submissions_data,
-                "contest": contest_data,
-                "error": None,
-                "api_used": api_used
+                "upstream_unavailable": True,
             }
+        except BaseException:
+            submissions_task.cancel()
+            contest_task.cancel()
+            raise
+
+        if not profile_data:
+            submissions_task.cancel()
+            contest_task.cancel()
+            return {"error": f"User '{username}' not found", "username": username}
+
+        submissions_data, contest_data = await asyncio.gather(submissions_task, contest_task)
 
+        return {
+            "username": username,
+            "profile": profile_data,
+            "submissions": submissions_data,
+            "contest": contest_data,
+            "error": None,
+            "api_used": api_used
+        }
 
-def calculate_streak_from_calendar(submission_calendar):
-    """Calculate current and max streak from submission calendar"""
-    if not submission_calendar:
-        return 0, 0
+    @staticmethod
+    async def _first_success(attempts, hedged: bool):
+        """Return the first non-None result of the attempt coroutine factories.
+
+        Serial mode tries them in order; hedged mode starts all of them at
+        once and cancels the rest when one succeeds.
+        """
+        if not hedged:
+            for attempt in attempts:
+                result = await attempt()
+                if result is not None:
+                    return result
+            return None
 
-    dates = []
-    for timestamp_str in submission_calendar.keys():
+        pending = {asyncio.ensure_future(attempt()) for attempt in attempts}
         try:
-            # timestamps in some APIs may be seconds or milliseconds (or strings)
-            timestamp = int(timestamp_str)
-            # If timestamp appears to be milliseconds, convert to seconds
-            if timestamp > 10**12:
-                timestamp = timestamp // 1000
-            elif timestamp > 10**11:
-                # borderline case, treat as ms
-                timestamp = timestamp // 1000
-            date = datetime.fromtimestamp(timestamp).date()
-            dates.append(date)
-        except:
-            continue
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
 
-    if not dates:
-        return 0, 0
+    @staticmethod
+    async def _request_json(session, method: str, url: str, timeout: int, answered=None, **kwargs):
+        """Send a request through the per-host rate limiter and circuit breaker.
+
+        Returns the decoded JSON body of a 200 response, or None on any
+        failure or when the host is currently being skipped. Hosts that
+        actually answered (anything but 429/5xx) are appended to the
+        answered list when one is given. The guard keeps its state in locked
+        files, so it runs in a worker thread to keep lock waits off the
+        shared event loop.
+        """
+        host = urlparse(url).hostname or url
+        if not await asyncio.to_thread(upstream_guard.acquire, host):
+            return None
 
-    dates = sorted(set(dates))
-    current_streak = 0
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
+        try:
+            async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                if response.status == 429 or response.status >= 500:
+                    await asyncio.to_thread(upstream_guard.record_failure, host)
+                    return None
+                await asyncio.to_thread(upstream_guard.record_success, host)
+                if answered is not None:
+                    answered.append(host)
+                if response.status == 200:
+                    return await response.json(content_type=None)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            await asyncio.to_thread(upstream_guard.record_failure, host)
+        except Exception:
+            pass
+        return None
 
-    if today in dates or yesterday in dates:
-        current_date = today if today in dates else yesterday
-        current_streak = 1
-        
-        for i in range(1, len(dates)):
-            prev_date = current_date - timedelta(days=1)
-            if prev_date in dates:
-                current_streak += 1
-                current_date = prev_date
-            else:
-                break
+    @staticmethod
+    async def _get_json(session, url: str, timeout: int, answered=None):
+        """GET url and return the decoded JSON body, or None on any failure"""
+        return await LeetCodeAPI._request_json(
+            session, 'GET', url, timeout, answered=answered, headers=LeetCodeAPI.HEADERS
+        )
 
-    max_streak = 0
-    temp_streak = 1
+    @staticmethod
+    async def _post_graphql(session, query: dict, timeout: int = 15, answered=None):
+        """POST a GraphQL query and return the decoded JSON body, or None on any failure"""
+        headers = dict(LeetCodeAPI.HEADERS, **{'Content-Type': 'application/json'})
+        return await LeetCodeAPI._request_json(
+            session, 'POST', LeetCodeAPI.GRAPHQL_URL, timeout, answered=answered, json=query, headers=headers
+        )
 
-    for i in range(1, len(dates)):
-        if (dates[i] - dates[i-1]).days == 1:
-            temp_streak += 1
-            max_streak = max(max_streak, temp_streak)
-        else:
-            temp_streak = 1
+    # ===== FETCH PROFILE DATA =====
+    @staticmethod
+    async def _fetch_profile(session, username: str, safe_username: str, hedged: bool):
+        """Return (profile_data, api_used), or (None, None) if no source knows the user.
+
+        Raises UpstreamUnavailable when no source answered at all (skipped by
+        the rate limiter or an open breaker, 429/5xx, network errors), since
+        that says nothing about whether the user exists.
+        """
+        answered = []
+        profile_endpoints = [
+            f"https://leetcode-stats-api.herokuapp.com/{safe_username}",
+            f"https://alfa-leetcode-api.onrender.com/userProfile/{safe_username}",
+            f"https://alfa-leetcode-api.onrender.com/{safe_username}",
+        ]
+
+        def rest_attempt(endpoint):
+            async def attempt():
+                data = await LeetCodeAPI._get_json(session, endpoint, 20, answered=answered)
+                return (data, endpoint) if data else None
+            return attempt
+
+        async def graphql_attempt():
+            graphql_profile_query = {
+                "query": """
+                    query userProfile($username: String!) {
+                        matchedUser(username: $username) {
+                            username
+                            profile {
+                                realName
+                                userAvatar
+                            }
+                            submitStats {
+                                acSubmissionNum {
+                                    difficulty
+                                    count
+                                }
+                            }
+                            submissionCalendar
+                            reputation
+                            ranking
+                        }
+                    }
+                """,
+                "variables": {"username": username}
+            }
 
-    max_streak = max(max_streak, temp_streak)
+            gql_data = await LeetCodeAPI._post_graphql(session, graphql_profile_query, answered=answered)
+            try:
+                m = ((gql_data or {}).get('data') or {}).get('matchedUser')
+                if not m:
+                    return None
+                # Build a normalized profile_data dict similar to other endpoints
+                prof = {}
+                prof['username'] = m.get('username')
+                prof['name'] = (m.get('profile') or {}).get('realName')
+                # derive counts from submitStats.acSubmissionNum
+                easy = 0
+                medium = 0
+                hard = 0
+                total = 0
+                ss = (m.get('submitStats') or {}).get('acSubmissionNum') or []
+                for item in ss:
+                    diff = (item.get('difficulty') or '').lower()
+                    cnt = int(item.get('count') or 0)
+                    if diff == 'all':
+                        total = cnt
+                    elif diff == 'easy':
+                        easy = cnt
+                    elif diff == 'medium':
+                        medium = cnt
+                    elif diff == 'hard':
+                        hard = cnt
+                prof['totalSolved'] = total or (easy + medium + hard)
+                prof['easySolved'] = easy
+                prof['mediumSolved'] = medium
+                prof['hardSolved'] = hard
+                prof['submissionCalendar'] = m.get('submissionCalendar')
+                prof['ranking'] = m.get('ranking')
+                return prof, 'graphql_profile'
+            except Exception:
+                return None
 
-    return current_streak, max_streak
+        # GraphQL is the last resort in serial mode, and raced alongside REST when hedged
+        attempts = [rest_attempt(e) for e in profile_endpoints] + [graphql_attempt]
+        result = await LeetCodeAPI._first_success(attempts, hedged)
+        if result is None and not answered:
+            raise UpstreamUnavailable(username)
+        return result or (None, None)
+
+    # ===== FETCH RECENT SUBMISSIONS =====
+    @staticmethod
+    async def _fetch_submissions(session, username: str, safe_username: str, hedged: bool):
+        """Return submissions as {'submission': [...]}, or None"""
+        submission_endpoints = [
+            f"https://alfa-leetcode-api.onrender.com/{safe_username}/submission",
+            f"https://alfa-leetcode-api.onrender.com/{safe_username}/acSubmission",
+        ]
+
+        def rest_attempt(endpoint):
+            async def attempt():
+                temp_data = await LeetCodeAPI._get_json(session, endpoint, 20)
+                if temp_data and isinstance(temp_data, dict) and 'submission' in temp_data:
+                    return temp_data
+                elif temp_data and isinstance(temp_data, list) and len(temp_data) > 0:
+                    return {'submission': temp_data}
+                return None
+            return attempt
+
+        # GraphQL fallback for submissions
+        async def graphql_attempt():
+            graphql_query = {
+                "query": """
+                    query recentSubmissions($username: String!, $limit: Int!) {
+                        recentSubmissionList(username: $username, limit: $limit) {
+                            title
+                            titleSlug
+                            timestamp
+                            statusDisplay
+                            lang
+                        }
+                    }
+                """,
+                "variables": {"username": username, "limit": 20}
+            }
+
+            graphql_data = await LeetCodeAPI._post_graphql(session, graphql_query)
+            if graphql_data and 'data' in graphql_data and 'recentSubmissionList' in (graphql_data['data'] or {}):
+                return {
+                    'submission': graphql_data['data']['recentSubmissionList']
+                }
+            return None
+
+        attempts = [rest_attempt(e) for e in submission_endpoints] + [graphql_attempt]
+        return await LeetCodeAPI._first_success(attempts, hedged)
+
+    # ===== FETCH CONTEST DATA =====
+    @staticmethod
+    async def _fetch_contest(session, safe_username: str, hedged: bool):
+        """Return the first non-empty contest payload, or None"""
+        contest_endpoints = [
+            f"https://alfa-leetcode-api.onrender.com/userContestRankingInfo/{safe_username}",
+            f"https://alfa-leetcode-api.onrender.com/{safe_username}/contest",
+        ]
+
+        def rest_attempt(endpoint):
+            async def attempt():
+                temp_contest_data = await LeetCodeAPI._get_json(session, endpoint, 15)
+                if temp_contest_data and isinstance(temp_contest_data, dict):
+                    # Accept contest data if it has expected keys or is non-empty
+                    return temp_contest_data
+                return None
+            return attempt
+
+        return await LeetCodeAPI._first_success([rest_attempt(e) for e in contest_endpoints], hedged)
+
+
+def calculate_streak_from_calendar(submission_calendar, tz_offset: int = 0):
+    """Calculate current and max streak from submission calendar (UTC days, or shifted by tz_offset seconds)"""
+    return calculate_streaks(submission_calendar, tz_offset)
 
 
 def parse_user_stats(user_data: dict) -> dict:
@@ -282,6 +351,7 @@ def parse_user_stats(user_data: dict) -> dict:
             "username": user_data.get("username", "Unknown"),
             "display_name": user_data.get("username", "Unknown"),
             "error": user_data["error"],
+            "upstream_unavailable": bool(user_data.get("upstream_unavailable")),
             "total_solved": 0,
             "easy": 0,
             "medium": 0,
@@ -314,15 +384,11 @@ def parse_user_stats(user_data: dict) -> dict:
     # Extract ranking
     ranking = profile.get("ranking", "N/A")
 
-    # Calculate streak from submissionCalendar
+    # Streaks come from the stored submission calendar, filled in after the
+    # write (see _fetch_and_store)
     current_streak = 0
     max_streak = 0
 
-    if "submissionCalendar" in profile:
-        current_streak, max_streak = calculate_streak_from_calendar(
-            profile["submissionCalendar"]
-        )
-
     # ===== RECENT SUBMISSIONS EXTRACTION =====
     recent_submissions = []
 
@@ -353,6 +419,7 @@ def parse_user_stats(user_data: dict) -> dict:
                 ts = normalize_timestamp(sub.get('timestamp'))
                 recent_submissions.append({
                     "title": sub.get("title", sub.get("titleSlug", "Unknown")),
+                    "title_slug": sub.get("titleSlug", ""),
                     "status": sub.get("statusDisplay", sub.get("status", "Unknown")),
                     "timestamp": ts,
                     "lang": sub.get("lang", "N/A")
@@ -364,6 +431,7 @@ def parse_user_stats(user_data: dict) -> dict:
             ts = normalize_timestamp(sub.get('timestamp'))
             recent_submissions.append({
                 "title": sub.get("title", sub.get("titleSlug", "Unknown")),
+                "title_slug": sub.get("titleSlug", ""),
                 "status": sub.get("statusDisplay", sub.get("status", "Unknown")),
                 "timestamp": ts,
                 "lang": sub.get("lang", "N/A")
@@ -377,6 +445,7 @@ def parse_user_stats(user_data: dict) -> dict:
                 ts = normalize_timestamp(sub.get('timestamp'))
                 recent_submissions.append({
                     "title": sub.get("title", sub.get("titleSlug", "Unknown")),
+                    "title_slug": sub.get("titleSlug", ""),
                     "status": sub.get("statusDisplay", sub.get("status", "Unknown")),
                     "timestamp": ts,
                     "lang": sub.get("lang", "N/A")
@@ -390,6 +459,7 @@ def parse_user_stats(user_data: dict) -> dict:
                 ts = normalize_timestamp(sub.get('timestamp'))
                 recent_submissions.append({
                     "title": sub.get("title", sub.get("titleSlug", "Unknown")),
+                    "title_slug": sub.get("titleSlug", ""),
                     "status": "Accepted",
                     "timestamp": ts,
                     "lang": sub.get("lang", "N/A")
@@ -488,24 +558,132 @@ def parse_user_stats(user_data: dict) -> dict:
 
 # ============= VIEWS =============
 
+# Marker in home.html where streamed cards are inserted
+_HOME_CARDS_MARKER = '<!--tracker:cards-->'
+
+
+def _home_users():
+    """TrackedUser rows in home page order"""
+    return TrackedUser.objects.order_by('-view_count', '-total_solved', '-pk')
+
+
+def _home_page(page: int):
+    """One page of home cards and whether another page follows"""
+    size = getattr(settings, 'HOME_PAGE_SIZE', 24)
+    offset = (page - 1) * size
+    users = list(_home_users()[offset:offset + size + 1])
+    # Show views still buffered in this worker as well
+    for user in users:
+        user.view_count += view_counter.pending(user.username)
+    return users[:size], len(users) > size
+
+
+@page_cache
 def home(request):
-    """Home page view - Shows all tracked users with statistics"""
-    # Return ALL users on home as requested (order by view_count desc then total_solved)
-    tracked_users = TrackedUser.objects.all().order_by('-view_count', '-total_solved')
-    total_users = TrackedUser.objects.count()
-    featured_users = TrackedUser.objects.filter(is_featured=True)[:6]
-    top_performers = TrackedUser.objects.order_by('-total_solved')[:10]
-    
+    """Home page view - Shows tracked users with statistics.
+
+    Renders the first HOME_PAGE_SIZE cards; the page loads more from
+    home_cards as the user scrolls. With ?stream=1 (or HOME_STREAMING) every
+    card is streamed in chunks instead.
+    """
     context = {
-        'total_users': total_users,
-        'tracked_users': tracked_users,
-        'featured_users': featured_users,
-        'top_performers': top_performers,
+        'total_users': _tracked_user_count(),
+        'featured_users': TrackedUser.objects.filter(is_featured=True)[:6],
     }
-    
+
+    stream = request.GET.get('stream') in ('1', 'true') or getattr(settings, 'HOME_STREAMING', False)
+    if stream and context['total_users']:
+        return _stream_home(request, context)
+
+    users, has_next = _home_page(1)
+    context['tracked_users'] = users
+    context['next_page_url'] = reverse('tracker:home_cards') + '?page=2' if has_next else None
     return render(request, 'tracker/home.html', context)
 
 
+def _stream_home(request, context):
+    """Stream home.html with every user's card rendered in chunks"""
+    page = render_to_string('tracker/home.html', dict(context, stream_cards=True), request=request)
+    head, tail = page.split(_HOME_CARDS_MARKER, 1)
+    chunk_size = getattr(settings, 'HOME_PAGE_SIZE', 24) * 4
+
+    def chunks():
+        yield head
+        batch = []
+        for user in _home_users().iterator(chunk_size=chunk_size):
+            batch.append(user)
+            if len(batch) >= chunk_size:
+                yield render_to_string('tracker/_user_card_list.html', {'users': batch})
+                batch = []
+        if batch:
+            yield render_to_string('tracker/_user_card_list.html', {'users': batch})
+        yield tail
+
+    return StreamingHttpResponse(chunks(), content_type='text/html; charset=utf-8')
+
+
+@page_cache
+def home_cards(request):
+    """HTML fragment with one page (?page=N) of home user cards for infinite scroll.
+
+    The URL of the following page, if any, is sent in the X-Next-Page header.
+    """
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except Exception:
+        page = 1
+    users, has_next = _home_page(page)
+    response = render(request, 'tracker/_user_card_list.html', {'users': users})
+    if has_next:
+        response['X-Next-Page'] = f"{reverse('tracker:home_cards')}?page={page + 1}"
+    return response
+
+
+def _stats_from_db_user(db_user, fetch_error=None) -> dict:
+    """Build a stats dict (parse_user_stats shape) from a cached TrackedUser row"""
+    return {
+        'username': db_user.username,
+        'display_name': db_user.display_name or db_user.username,
+        'total_solved': db_user.total_solved,
+        'easy': db_user.easy_solved,
+        'medium': db_user.medium_solved,
+        'hard': db_user.hard_solved,
+        'easy_solved': db_user.easy_solved,
+        'medium_solved': db_user.medium_solved,
+        'hard_solved': db_user.hard_solved,
+        'ranking': db_user.ranking or 'N/A',
+        'contest_rating': db_user.contest_rating or 'N/A',
+        'current_streak': getattr(db_user, 'current_streak', 0) or 0,
+        'max_streak': getattr(db_user, 'max_streak', 0) or 0,
+        'recent_submissions': getattr(db_user, 'recent_submissions', []) or [],
+        'error': None,
+        'fetch_error': fetch_error,
+    }
+
+
+def _cached_profile_stats(tracked_user):
+    """Stats for an already-tracked user without any upstream call.
+
+    Uses the stats cache when it has an entry, otherwise the TrackedUser row.
+    Adds data_age (seconds) and stale so the page can decide whether to
+    refresh client-side.
+    """
+    entry = stats_cache.get(tracked_user.username)
+    if entry is not None:
+        stats = dict(entry['stats'])
+        age = time.time() - entry['fetched_at']
+    else:
+        stats = _stats_from_db_user(tracked_user)
+        # A row that was never filled by a successful fetch has no real data yet
+        age = None
+        if tracked_user.last_fetched is not None:
+            age = (timezone.now() - tracked_user.last_fetched).total_seconds()
+
+    stats['data_age'] = int(age) if age is not None else None
+    stats['stale'] = age is None or age > getattr(settings, 'STATS_CACHE_TTL', 300)
+    return stats
+
+
 def profile(request, username):
     """Profile page view - Shows detailed user statistics"""
     tracked_user, created = TrackedUser.objects.get_or_create(
@@ -514,12 +692,18 @@ def profile(request, username):
     )
     
     tracked_user.increment_views()
+
+    # Already-tracked users render straight from cache/DB; the page refreshes
+    # itself from the API when the data is stale.
+    if not created and getattr(settings, 'PROFILE_RENDER_FROM_DB', True):
+        return render(request, 'tracker/profile_professional.html', {
+            'username': username,
+            'initial_data_json': json.dumps(_cached_profile_stats(tracked_user), default=str),
+        })
+
     # Attempt to fetch user data server-side so the template can render immediately
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        stats = loop.run_until_complete(get_user_data(username))
-        loop.close()
+        stats = shared_client.run(get_user_data(username))
     except Exception as e:
         stats = {"error": str(e), "username": username}
 
@@ -531,21 +715,7 @@ def profile(request, username):
             db_user = None
 
         if db_user:
-            stats = {
-                'username': db_user.username,
-                'display_name': db_user.display_name or db_user.username,
-                'total_solved': db_user.total_solved,
-                'easy': db_user.easy_solved,
-                'medium': db_user.medium_solved,
-                'hard': db_user.hard_solved,
-                'ranking': db_user.ranking or 'N/A',
-                'contest_rating': db_user.contest_rating or 'N/A',
-                'current_streak': getattr(db_user, 'current_streak', 0) or 0,
-                'max_streak': getattr(db_user, 'max_streak', 0) or 0,
-                'recent_submissions': getattr(db_user, 'recent_submissions', []) or [],
-                'error': None,
-                'fetch_error': stats.get('error') if isinstance(stats, dict) else None,
-            }
+            stats = _stats_from_db_user(db_user, fetch_error=stats.get('error'))
 
     # Serialize initial data to inject into template safely
     initial_data_json = json.dumps(stats, default=str)
@@ -556,32 +726,34 @@ def profile(request, username):
     })
 
 
-def profiles(request):
-    """Render a page showing multiple profiles supplied via ?usernames=a,b,c"""
-    q = request.GET.get('usernames', '').strip()
-    if not q:
-        return render(request, 'tracker/home.html', {
-            'total_users': 0,
-            'tracked_users': [],
-            'featured_users': [],
-            'top_performers': [],
-        })
+def _parse_username_list(q: str):
+    """Split a comma- or whitespace-separated username list"""
+    return [u.strip() for u in re.split(r'[\s,]+', q or '') if u.strip()]
 
-    # Accept comma-separated or whitespace-separated lists, normalize them
-    usernames = [u.strip() for u in re.split(r'[\s,]+', q) if u.strip()]
-    # Limit to reasonable number
-    usernames = usernames[:50]
 
-    # Fetch stats for each username concurrently
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        tasks = [get_user_data(u) for u in usernames]
-        results = loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
-        loop.close()
-    except Exception as e:
-        results = [{'username': u, 'error': str(e)} for u in usernames]
+def _failed_usernames(usernames, results):
+    """Usernames whose fetch raised or returned an API-level error"""
+    return [
+        u for u, r in zip(usernames, results)
+        if isinstance(r, Exception) or (isinstance(r, dict) and r.get('error'))
+    ]
+
 
+def _empty_profiles_context():
+    return {
+        'total_users': 0,
+        'tracked_users': [],
+        'featured_users': [],
+        'top_performers': [],
+    }
+
+
+def _profiles_context(usernames, results, fallback_users) -> dict:
+    """Build the home.html context for the multi-profile page.
+
+    fallback_users maps input usernames to cached TrackedUser rows (or None)
+    for the users whose fetch failed.
+    """
     # Normalize results: ensure list of dicts and map keys to match template expectations
     users = []
     for idx, r in enumerate(results):
@@ -592,12 +764,7 @@ def profiles(request):
         # "User not found" for previously added users.
         if isinstance(r, Exception) or (isinstance(r, dict) and r.get('error')):
             # Attempt DB fallback
-            fallback_user = None
-            try:
-                if input_username:
-                    fallback_user = TrackedUser.objects.filter(username__iexact=input_username).first()
-            except Exception:
-                fallback_user = None
+            fallback_user = fallback_users.get(input_username)
 
             if fallback_user:
                 users.append({
@@ -640,6 +807,7 @@ def profiles(request):
                     'is_featured': False,
                     'recent_submissions': [],
                     'invalid': True,
+                    'upstream_unavailable': isinstance(r, dict) and bool(r.get('upstream_unavailable')),
                     'fetch_error': str(r) if isinstance(r, Exception) else r.get('error'),
                     'error': r.get('error') if isinstance(r, dict) else str(r),
                     'current_streak': 0,
@@ -679,48 +847,248 @@ def profiles(request):
     # keep invalid users in the input order but ensure they are at the end
     users = valid_users + invalid_users
 
-    context = {
+    return {
         'total_users': len(users),
         'tracked_users': users,
         'featured_users': [],
         'top_performers': [],
     }
 
-    return render(request, 'tracker/home.html', context)
 
+def profiles(request):
+    """Render a page showing multiple profiles supplied via ?usernames=a,b,c"""
+    # Accept comma-separated or whitespace-separated lists, normalize them
+    usernames = _parse_username_list(request.GET.get('usernames', '').strip())
+    if not usernames:
+        return render(request, 'tracker/home.html', _empty_profiles_context())
 
-async def get_user_data(username: str):
-    """Async helper to fetch user data"""
-    data = await LeetCodeAPI.fetch_user_data(username)
-    stats = parse_user_stats(data)
-    
-    # Update tracked user in database
-    if not stats.get('error'):
-        try:
-            # Use the canonical username returned by the API if available
-            db_username = stats.get('username') or username
+    # Limit to reasonable number
+    usernames = usernames[:50]
+
+    # Fetch stats for each username concurrently
+    try:
+        results = shared_client.run(_gather_user_data(usernames))
+    except Exception as e:
+        results = [{'username': u, 'error': str(e)} for u in usernames]
+
+    # If a task raised or the API returned an error, fall back to the DB
+    # cached TrackedUser to avoid showing "User not found" for previously
+    # added users.
+    fallback_users = _fallback_users(usernames, results)
+
+    return render(request, 'tracker/home.html', _profiles_context(usernames, results, fallback_users))
+
+
+async def get_user_data(username: str, force_refresh: bool = False, pending_writes=None,
+                        bypass_raw_cache: bool = False):
+    """Async helper to fetch user data.
+
+    Served from the stats cache when possible: fresh entries are returned
+    directly, stale entries are returned immediately while a background
+    refresh runs. Pass force_refresh=True to always refetch; the raw
+    payloads are still reused within their RAW_*_CACHE_TTL unless
+    bypass_raw_cache=True too (an explicit refresh by the user).
+
+    When pending_writes is a list, a fetch started by this call appends
+    (username, stats, calendar, contest_history) to it instead of writing
+    to the database, so the caller can persist a whole batch at once (see
+    _gather_user_data).
+    """
+    if not force_refresh:
+        entry = stats_cache.get(username)
+        if entry is not None:
+            if not stats_cache.is_fresh(entry):
+                schedule_refresh(username)
+            return dict(entry['stats'])
+
+    return dict(await _refresh_user_data(username, pending_writes, bypass_raw_cache=bypass_raw_cache))
+
+
+# In-flight upstream fetches on the shared loop, keyed by normalized username
+_inflight_fetches = {}
+
+
+async def _refresh_user_data(username: str, pending_writes=None, bypass_raw_cache=False):
+    """Fetch, parse and persist one user, coalescing concurrent calls.
+
+    Every caller in this worker that asks for the same username while a
+    fetch is running awaits that fetch instead of starting its own. The
+    caller that starts the fetch decides how it is persisted and whether
+    it bypasses the raw response cache.
+    """
+    if not shared_client.in_client_loop():
+        return await shared_client.run_async(_refresh_user_data(username, pending_writes, bypass_raw_cache))
+
+    key = normalize_username(username)
+    task = _inflight_fetches.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store(username, pending_writes, bypass_raw_cache))
+        _inflight_fetches[key] = task
+        task.add_done_callback(lambda t: _inflight_fetches.pop(key, None))
+
+    # Shield so one caller going away does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_store(username: str, pending_writes=None, bypass_raw_cache=False):
+    """Fetch a user from upstream, update the stats cache and the database.
+
+    With a pending_writes list the database write is left to the caller.
+    """
+    started = time.time()
+    locked = False
+    if getattr(settings, 'STATS_SINGLE_FLIGHT_SHARED', False):
+        # Another worker may already be fetching this user: wait for its
+        # result to land in the shared cache before going upstream ourselves.
+        locked = await asyncio.to_thread(stats_cache.acquire_fetch_lock, username)
+        if not locked:
+            entry = await _wait_for_shared_stats(username, started)
+            if entry is not None:
+                return entry['stats']
+
+    try:
+        data = await LeetCodeAPI.fetch_user_data(username, use_cache=not bypass_raw_cache)
+        stats = parse_user_stats(data)
+        
+        # Update tracked user in database
+        if not stats.get('error'):
+            calendar, contest_history = _submission_calendar(data), _contest_history(data)
+            if pending_writes is not None:
+                # _gather_user_data writes the batch, then fills in the
+                # streaks and caches the stats
+                pending_writes.append((username, stats, calendar, contest_history))
+                return stats
+            try:
+                # Plain worker thread rather than the async ORM: thread-sensitive
+                # calls from the shared loop would queue behind request threads
+                tracked_user = await asyncio.to_thread(_store_stats, username, stats, calendar, contest_history)
+            except Exception:
+                # Fail silently on update errors in async path
+                tracked_user = None
+            _fill_streaks(stats, tracked_user, calendar)
+            stats_cache.set(username, stats, aliases=[stats.get('username')])
+        
+        return stats
+    finally:
+        if locked:
+            await asyncio.to_thread(stats_cache.release_fetch_lock, username)
+
+
+def _submission_calendar(data):
+    """Raw submissionCalendar from an upstream response, if any"""
+    profile = data.get('profile') if isinstance(data, dict) else None
+    return profile.get('submissionCalendar') if isinstance(profile, dict) else None
+
+
+def _contest_history(data):
+    """Raw contest rating history from an upstream response, if any"""
+    if not isinstance(data, dict):
+        return None
+    for source in (data.get('contest'), data.get('profile')):
+        if isinstance(source, dict):
+            for key in ('userContestRankingHistory', 'contestParticipation'):
+                if isinstance(source.get(key), list):
+                    return source[key]
+    return None
+
+
+def _fill_streaks(stats: dict, tracked_user, calendar):
+    """Set stats' streaks from the stored activity (the whole calendar only if the write failed)"""
+    if tracked_user is not None:
+        stats['current_streak'], stats['max_streak'] = tracked_user.current_streak, tracked_user.max_streak
+    else:
+        stats['current_streak'], stats['max_streak'] = calculate_streak_from_calendar(calendar)
+
+
+def _store_stats(username: str, stats: dict, calendar=None, contest_history=None):
+    """Create or update the TrackedUser row for freshly parsed stats; returns the row"""
+    # Use the canonical username returned by the API if available
+    db_username = stats.get('username') or username
 
-            tracked_user, created = await TrackedUser.objects.aget_or_create(
-                username=db_username,
-                defaults={'display_name': stats.get('display_name', db_username)}
-            )
+    tracked_user, created = TrackedUser.objects.get_or_create(
+        username=db_username,
+        defaults={'display_name': stats.get('display_name', db_username)}
+    )
+    tracked_user.update_stats(stats, calendar, contest_history)
+    return tracked_user
+
+
+async def _wait_for_shared_stats(username: str, since: float):
+    """Poll the shared stats cache for an entry fetched after since (or give up)."""
+    deadline = time.monotonic() + getattr(settings, 'STATS_SINGLE_FLIGHT_WAIT', 10)
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        entry = await asyncio.to_thread(stats_cache.get_shared, username)
+        if entry is not None and entry['fetched_at'] >= since:
+            return entry
+    return None
+
+
+async def _gather_user_data(usernames):
+    """Fetch several users concurrently, returning exceptions in place of results.
 
-            # Ensure updates happen in a thread to avoid blocking the event loop
-            await asyncio.to_thread(tracked_user.update_stats, stats)
+    Fresh results are persisted together afterwards in one transaction
+    rather than one write (and thread hop) per user, then get their
+    streaks from the stored activity and go into the stats cache.
+    """
+    pending_writes = []
+    results = await asyncio.gather(
+        *[get_user_data(u, pending_writes=pending_writes) for u in usernames],
+        return_exceptions=True,
+    )
+    if pending_writes:
+        try:
+            stored = await asyncio.to_thread(TrackedUser.store_stats_many, pending_writes)
         except Exception:
-            # Fail silently on update errors in async path
-            pass
-    
-    return stats
+            stored = {}
+        written = {}
+        for username, stats, calendar, _ in pending_writes:
+            _fill_streaks(stats, stored.get(stats.get('username') or username), calendar)
+            stats_cache.set(username, stats, aliases=[stats.get('username')])
+            written[normalize_username(username)] = stats
+        for i, username in enumerate(usernames):
+            stats = written.get(normalize_username(username))
+            if stats is not None and isinstance(results[i], dict):
+                results[i]['current_streak'] = stats['current_streak']
+                results[i]['max_streak'] = stats['max_streak']
+    return results
+
+
+def _fallback_users(usernames, results) -> dict:
+    """Cached TrackedUser rows (or None) for the usernames whose fetch failed, in one query"""
+    failed = _failed_usernames(usernames, results)
+    if not failed:
+        return {}
+    try:
+        rows = TrackedUser.objects.annotate(username_lower=Lower('username')).filter(
+            username_lower__in={u.lower() for u in failed}
+        )
+        by_lower = {row.username.lower(): row for row in rows}
+    except Exception:
+        by_lower = {}
+    return {u: by_lower.get(u.lower()) for u in failed}
+
+
+def schedule_refresh(username: str):
+    """Refresh a user's cached stats in the background (at most one refresh per user)."""
+    if not stats_cache.begin_refresh(username):
+        return
+
+    future = shared_client.submit(_refresh_user_data(username))
+    future.add_done_callback(lambda f: stats_cache.end_refresh(username))
 
 
 def api_user_data(request, username):
-    """API endpoint to fetch user data"""
+    """API endpoint to fetch user data.
+
+    ?refresh=1 bypasses the stats cache, ?refresh=force the raw response
+    cache as well.
+    """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        user_stats = loop.run_until_complete(get_user_data(username))
-        loop.close()
+        refresh = request.GET.get('refresh')
+        user_stats = shared_client.run(get_user_data(
+            username, force_refresh=refresh in ('1', 'true', 'force'), bypass_raw_cache=refresh == 'force'
+        ))
 
         # If the fetch failed, attempt to return cached DB data instead of an error
         if isinstance(user_stats, dict) and user_stats.get('error'):
@@ -730,28 +1098,57 @@ def api_user_data(request, username):
                 db_user = None
 
             if db_user:
-                cached = {
-                    'username': db_user.username,
-                    'display_name': db_user.display_name or db_user.username,
-                    'total_solved': db_user.total_solved,
-                    'easy': db_user.easy_solved,
-                    'medium': db_user.medium_solved,
-                    'hard': db_user.hard_solved,
-                    'ranking': db_user.ranking or 'N/A',
-                    'contest_rating': db_user.contest_rating or 'N/A',
-                    'current_streak': getattr(db_user, 'current_streak', 0) or 0,
-                    'max_streak': getattr(db_user, 'max_streak', 0) or 0,
-                    'recent_submissions': getattr(db_user, 'recent_submissions', []) or [],
-                    'error': None,
-                    'fetch_error': user_stats.get('error')
-                }
-                return JsonResponse(cached)
+                return JsonResponse(_stats_from_db_user(db_user, fetch_error=user_stats.get('error')))
 
         return JsonResponse(user_stats)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _multi_request_usernames(request):
+    """Usernames for the multi-user API from GET ?usernames= or a POST JSON body, capped by ?limit"""
+    usernames = []
+    if request.method == 'POST':
+        try:
+            body = json.loads(request.body.decode('utf-8') or '{}')
+        except Exception:
+            body = {}
+
+        if isinstance(body, dict) and body.get('usernames'):
+            usernames = list(body.get('usernames'))
+    else:
+        # Accept comma-separated or whitespace-separated lists
+        usernames = _parse_username_list(request.GET.get('usernames', '').strip())
+
+    # Respect a reasonable limit to avoid overloading the server
+    try:
+        limit = int(request.GET.get('limit', 20))
+    except Exception:
+        limit = 20
+    if limit <= 0:
+        limit = 20
+
+    return usernames[:limit]
+
+
+def _multi_results(usernames, results, fallback_users) -> list:
+    """Normalize multi-user results, substituting cached rows for failed fetches"""
+    out = []
+    for u, r in zip(usernames, results):
+        # If exception or API-level error, use the DB fallback for this user
+        if isinstance(r, Exception) or (isinstance(r, dict) and r.get('error')):
+            db_user = fallback_users.get(u)
+            if db_user:
+                stats = _stats_from_db_user(db_user, fetch_error=str(r) if isinstance(r, Exception) else r.get('error'))
+                stats['recent_submissions'] = []
+                out.append(stats)
+            else:
+                out.append({'username': u, 'error': str(r) if isinstance(r, Exception) else r.get('error')})
+        else:
+            out.append(r)
+    return out
+
+
 def api_user_data_multi(request):
     """API endpoint to fetch multiple users' data concurrently.
 
@@ -762,182 +1159,455 @@ def api_user_data_multi(request):
     Optional query param: limit (max users to process, default 20)
     """
     try:
-        # Parse usernames from GET or POST
-        usernames = []
-        if request.method == 'POST':
-            try:
-                body = json.loads(request.body.decode('utf-8') or '{}')
-            except Exception:
-                body = {}
-
-            if isinstance(body, dict) and body.get('usernames'):
-                usernames = list(body.get('usernames'))
-        else:
-            q = request.GET.get('usernames', '').strip()
-            if q:
-                # Accept comma-separated or whitespace-separated lists
-                usernames = [u.strip() for u in re.split(r'[\s,]+', q) if u.strip()]
-
+        usernames = _multi_request_usernames(request)
         if not usernames:
             return JsonResponse({'error': 'No usernames provided. Use ?usernames=a,b or POST {"usernames": [...]}'}, status=400)
 
-        # Respect a reasonable limit to avoid overloading the server
-        try:
-            limit = int(request.GET.get('limit', 20))
-        except Exception:
-            limit = 20
-        if limit <= 0:
-            limit = 20
-
-        usernames = usernames[:limit]
-
         # Run concurrent fetches
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        tasks = [get_user_data(u) for u in usernames]
-        results = loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
-        loop.close()
-
-        # Normalize exceptions
-        out = []
-        for u, r in zip(usernames, results):
-            # If exception or API-level error, attempt DB fallback per-user
-            if isinstance(r, Exception) or (isinstance(r, dict) and r.get('error')):
-                try:
-                    db_user = TrackedUser.objects.filter(username__iexact=u).first()
-                except Exception:
-                    db_user = None
-
-                if db_user:
-                    out.append({
-                        'username': db_user.username,
-                        'display_name': db_user.display_name or db_user.username,
-                        'total_solved': db_user.total_solved,
-                        'easy': db_user.easy_solved,
-                        'medium': db_user.medium_solved,
-                        'hard': db_user.hard_solved,
-                        'ranking': db_user.ranking or 'N/A',
-                        'contest_rating': db_user.contest_rating or 'N/A',
-                        'current_streak': getattr(db_user, 'current_streak', 0) or 0,
-                        'max_streak': getattr(db_user, 'max_streak', 0) or 0,
-                        'recent_submissions': [],
-                        'error': None,
-                        'fetch_error': str(r) if isinstance(r, Exception) else r.get('error')
-                    })
-                else:
-                    out.append({'username': u, 'error': str(r) if isinstance(r, Exception) else r.get('error')})
-            else:
-                out.append(r)
+        results = shared_client.run(_gather_user_data(usernames))
 
+        fallback_users = _fallback_users(usernames, results)
+
+        out = _multi_results(usernames, results, fallback_users)
         return JsonResponse({'count': len(out), 'results': out}, json_dumps_params={'indent': 2})
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+# Sort modes for api_users_list: (sort key expression, cursor value type).
+# Keys sort descending with NULLs (unrated users) last.
+_USER_LIST_SORTS = {
+    'views': (F('view_count'), 'int'),
+    'solved': (F('total_solved'), 'int'),
+    'rating': (F('contest_rating'), 'float'),
+    # Most recent submission first, falling back to last_updated
+    'recent': (Coalesce('last_submission', 'last_updated', output_field=DateTimeField()), 'datetime'),
+}
+
+# Serialized api_users_list field -> model column
+_USER_LIST_FIELDS = {
+    'username': 'username',
+    'display_name': 'display_name',
+    'total_solved': 'total_solved',
+    'easy': 'easy_solved',
+    'medium': 'medium_solved',
+    'hard': 'hard_solved',
+    'ranking': 'ranking',
+    'contest_rating': 'contest_rating',
+    'view_count': 'view_count',
+    'is_featured': 'is_featured',
+    # Last successful fetch (rows never fetched report when they were added)
+    'last_updated': 'last_fetched',
+    'current_streak': 'current_streak',
+    'max_streak': 'max_streak',
+}
+
+
+def _encode_cursor(value, pk) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, kind: str):
+    """Return (sort value, pk) from a cursor produced by _encode_cursor"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+    value, pk = json.loads(raw.decode('utf-8'))
+    if value is None:
+        pass
+    elif kind == 'datetime':
+        value = datetime.fromisoformat(value)
+    elif kind == 'float':
+        value = float(value)
+    else:
+        value = int(value)
+    return value, int(pk)
+
+
+def _tracked_user_count() -> int:
+    """Total number of tracked users, cached for USERS_COUNT_CACHE_TTL seconds"""
+    key = 'tracker:users:count'
+    try:
+        total = cache.get(key)
+    except Exception:
+        total = None
+    if total is None:
+        total = TrackedUser.objects.count()
+        try:
+            cache.set(key, total, timeout=getattr(settings, 'USERS_COUNT_CACHE_TTL', 60))
+        except Exception:
+            pass
+    return total
+
+
 def api_users_list(request):
-    """API endpoint to get list of all tracked users"""
+    """API endpoint to list tracked users, one keyset-paginated page at a time.
+
+    ?sort=views|solved|rating|recent, ?limit=N (limit=all means the largest
+    page, USERS_LIST_MAX_PAGE), ?cursor= from the previous page's
+    next_cursor, ?fields=a,b to only return some fields, ?search=.
+    """
     try:
         sort_by = request.GET.get('sort', 'views')
+        if sort_by not in _USER_LIST_SORTS:
+            sort_by = 'views'
+        sort_key, kind = _USER_LIST_SORTS[sort_by]
+
+        max_page = getattr(settings, 'USERS_LIST_MAX_PAGE', 500)
         limit_param = request.GET.get('limit', '20')
-        # support 'all' to return every user
         if isinstance(limit_param, str) and limit_param.lower() == 'all':
-            limit = None
+            limit = max_page
         else:
             try:
                 limit = int(limit_param)
             except Exception:
                 limit = 20
-        if limit is not None and limit <= 0:
-            limit = None
+            if limit <= 0:
+                limit = max_page
+        limit = min(limit, max_page)
         search = request.GET.get('search', '').strip()
-        
-        users = TrackedUser.objects.all()
+
+        requested = [f.strip() for f in request.GET.get('fields', '').split(',') if f.strip()]
+        fields = [f for f in requested if f in _USER_LIST_FIELDS] or list(_USER_LIST_FIELDS)
+        if 'username' not in fields:
+            fields.insert(0, 'username')
+        columns = {_USER_LIST_FIELDS[f] for f in fields}
+        if 'display_name' in fields:
+            columns.add('username')
+        if 'last_updated' in fields:
+            columns.add('last_updated')
+
+        users = TrackedUser.objects.annotate(sort_key=sort_key)
         
         if search:
-            users = users.filter(
-                Q(username__icontains=search) | 
-                Q(display_name__icontains=search)
-            )
-        
-        if sort_by == 'solved':
-            users = users.order_by('-total_solved')
-        elif sort_by == 'rating':
-            users = users.order_by('-contest_rating')
-        elif sort_by == 'recent':
-            # Order by most recent submission, fall back to last_updated
-            users = users.order_by('-last_submission', '-last_updated')
-        else:
-            users = users.order_by('-view_count')
-        
-        if limit is not None:
-            users = users[:limit]
-        
+            users = filter_users(users, search)
+
+        cursor = request.GET.get('cursor', '').strip()
+        if cursor:
+            try:
+                after_value, after_pk = _decode_cursor(cursor, kind)
+            except Exception:
+                return JsonResponse({"error": "Invalid cursor"}, status=400)
+            if after_value is None:
+                users = users.filter(sort_key__isnull=True, pk__lt=after_pk)
+            else:
+                users = users.filter(
+                    Q(sort_key__lt=after_value) | Q(sort_key__isnull=True) |
+                    Q(sort_key=after_value, pk__lt=after_pk)
+                )
+
+        ordering = (F('sort_key').desc(nulls_last=True), F('pk').desc())
+        rows = list(users.order_by(*ordering).values('pk', 'sort_key', *columns)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
         users_data = []
-        for user in users:
-            users_data.append({
-                'username': user.username,
-                'display_name': user.display_name or user.username,
-                'total_solved': user.total_solved,
-                'easy': user.easy_solved,
-                'medium': user.medium_solved,
-                'hard': user.hard_solved,
-                'ranking': user.ranking,
-                'contest_rating': user.contest_rating,
-                'view_count': user.view_count,
-                'is_featured': user.is_featured,
-                'last_updated': user.last_updated.isoformat(),
-                'current_streak': getattr(user, 'current_streak', 0) or 0,
-                'max_streak': getattr(user, 'max_streak', 0) or 0,
-            })
+        for row in rows:
+            item = {}
+            for f in fields:
+                value = row[_USER_LIST_FIELDS[f]]
+                if f == 'display_name':
+                    value = value or row['username']
+                elif f == 'last_updated':
+                    value = (value or row['last_updated']).isoformat()
+                elif f in ('current_streak', 'max_streak'):
+                    value = value or 0
+                item[f] = value
+            users_data.append(item)
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = _encode_cursor(rows[-1]['sort_key'], rows[-1]['pk'])
         
         return JsonResponse({
-            'total': TrackedUser.objects.count(),
+            'total': _tracked_user_count(),
             'count': len(users_data),
-            'users': users_data
+            'users': users_data,
+            'next_cursor': next_cursor,
         })
     
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def api_users_search(request):
+    """Typeahead endpoint: ranked username/display name matches for ?q= (max ?limit=, default 8)"""
+    try:
+        query = request.GET.get('q', '').strip()
+        try:
+            limit = max(1, min(int(request.GET.get('limit', 8)), 50))
+        except Exception:
+            limit = 8
+
+        users = suggest_users(query, limit)
+        return JsonResponse({
+            'query': query,
+            'results': [
+                {
+                    'username': u.username,
+                    'display_name': u.display_name or u.username,
+                    'total_solved': u.total_solved,
+                }
+                for u in users
+            ],
+        })
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def api_last_submissions(request):
+    """API endpoint returning only the latest submission for several users.
+
+    Served entirely from the database (no upstream calls), for the home page
+    activity cards. GET only, with ?usernames=alice,bob (at most 500
+    usernames per request; the page sends them in chunks).
+    """
+    try:
+        if request.method != 'GET':
+            return JsonResponse({'error': 'Use GET ?usernames=a,b'}, status=405)
+
+        usernames = _parse_username_list(request.GET.get('usernames', '').strip())
+        if not usernames:
+            return JsonResponse({'error': 'No usernames provided. Use ?usernames=a,b'}, status=400)
+
+        usernames = usernames[:500]
+
+        rows = TrackedUser.objects.filter(username__in=usernames).values_list('username', 'recent_submissions')
+        latest = {}
+        for db_username, recs in rows:
+            latest[db_username] = recs[0] if isinstance(recs, list) and recs else None
+
+        results = {u: latest.get(u) for u in usernames}
+        return JsonResponse({'count': len(results), 'results': results})
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _leaderboard_row(entry) -> dict:
+    value = entry.value if entry.category == 'contest' else int(entry.value)
+    return {
+        'rank': entry.rank,
+        'username': entry.user.username,
+        'display_name': entry.user.display_name or entry.user.username,
+        'value': value,
+        'total_solved': entry.user.total_solved,
+    }
+
+
+@page_cache
 def api_leaderboard(request):
-    """API endpoint for leaderboard data"""
+    """API endpoint for leaderboard data.
+
+    Reads the materialized LeaderboardEntry snapshot for ?category= (total,
+    easy, medium, hard, contest, streak). Supports ?limit=&offset= paging and
+    ?username= to include that user's own position.
+    """
     try:
         category = request.GET.get('category', 'total')
-        limit = int(request.GET.get('limit', 10))
-        
-        if category == 'easy':
-            users = TrackedUser.objects.order_by('-easy_solved')[:limit]
-            key = 'easy_solved'
-        elif category == 'medium':
-            users = TrackedUser.objects.order_by('-medium_solved')[:limit]
-            key = 'medium_solved'
-        elif category == 'hard':
-            users = TrackedUser.objects.order_by('-hard_solved')[:limit]
-            key = 'hard_solved'
-        elif category == 'contest':
-            users = TrackedUser.objects.filter(contest_rating__isnull=False).order_by('-contest_rating')[:limit]
-            key = 'contest_rating'
+        if category not in LeaderboardEntry.CATEGORIES:
+            category = 'total'
+        limit = max(1, min(int(request.GET.get('limit', 10)), 500))
+        offset = max(0, int(request.GET.get('offset', 0)))
+
+        board = LeaderboardEntry.objects.filter(category=category).select_related('user')
+        entries = board.order_by('rank', 'user__username')[offset:offset + limit]
+
+        response = {
+            'category': category,
+            'offset': offset,
+            'limit': limit,
+            'total': board.count(),
+            'leaderboard': [_leaderboard_row(e) for e in entries],
+        }
+
+        username = request.GET.get('username', '').strip()
+        if username:
+            entry = board.filter(user__username__iexact=username).first()
+            response['user'] = _leaderboard_row(entry) if entry else None
+
+        return JsonResponse(response)
+    
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def api_leaderboard_rank(request, username):
+    """API endpoint for a user's leaderboard position and the users around it.
+
+    ?category= as for api_leaderboard, ?neighbors=N users on each side
+    (default 5, max 50). Served from the in-memory rank index.
+    """
+    try:
+        category = request.GET.get('category', 'total')
+        if category not in LeaderboardEntry.CATEGORIES:
+            category = 'total'
+        neighbors = max(0, min(int(request.GET.get('neighbors', 5)), 50))
+
+        result = rank_index.neighborhood(category, username, neighbors)
+        if result is None:
+            return JsonResponse({'error': f"User '{username}' is not ranked in {category}"}, status=404)
+        if category != 'contest':
+            for row in [result['user'], *result['above'], *result['below']]:
+                row['value'] = int(row['value'])
+        return JsonResponse(result)
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def api_user_activity(request, username):
+    """API endpoint for a user's stored per-day submission counts (heatmap data).
+
+    ?days=N limits the series to the last N days (default 365, max 3650).
+    Served from the database; nothing is fetched upstream.
+    """
+    try:
+        activity = UserActivity.objects.filter(user__username__iexact=username).select_related('user').first()
+        if activity is None:
+            return JsonResponse({'error': f"No activity stored for '{username}'"}, status=404)
+
+        days = max(1, min(int(request.GET.get('days', 365)), 3650))
+        today = today_day()
+        first = today - days + 1
+        counts = activity.get_counts()
+        series = [
+            counts[day - activity.start_day] if 0 <= day - activity.start_day < len(counts) else 0
+            for day in range(first, today + 1)
+        ]
+
+        return JsonResponse({
+            'username': activity.user.username,
+            'start_date': _day_to_date(first).isoformat(),
+            'end_date': _day_to_date(today).isoformat(),
+            'counts': series,
+            'active_days': sum(1 for c in series if c),
+            'total_submissions': sum(series),
+            'current_streak': activity.current_streak(today),
+            'max_streak': activity.max_streak,
+        })
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _day_to_date(day: int):
+    return datetime(1970, 1, 1).date() + timedelta(days=day)
+
+
+# Upper bounds for stats history responses
+_HISTORY_MAX_USERS = 20
+_HISTORY_MAX_POINTS = 500
+
+
+def _history_series(user, since, until, points, fields) -> dict:
+    series = StatsSnapshot.series(user, since, until, points)
+    out = {
+        'username': user.username,
+        'timestamps': [int(taken_at.timestamp()) for taken_at, _ in series],
+        **{f: [values[f] for _, values in series] for f in fields},
+    }
+    if series:
+        first, last = series[0][1], series[-1][1]
+        out['change'] = {
+            f: (last[f] - first[f]) if last[f] is not None and first[f] is not None else None
+            for f in fields
+        }
+    return out
+
+
+def api_users_history(request, username=None):
+    """API endpoint for downsampled stats history of one or many users.
+
+    /api/user/<username>/history/ or /api/users/history/?usernames=a,b
+    (at most 20). ?days=N (default 30) or ?since=/&until= unix seconds,
+    ?points=N per user (default 100, max 500), ?fields=total_solved,...
+    Series are columnar: timestamps plus one list per field.
+    """
+    try:
+        if username:
+            usernames = [username]
         else:
-            users = TrackedUser.objects.order_by('-total_solved')[:limit]
-            key = 'total_solved'
-        
-        leaderboard = []
-        for rank, user in enumerate(users, 1):
-            leaderboard.append({
-                'rank': rank,
-                'username': user.username,
-                'display_name': user.display_name or user.username,
-                'value': getattr(user, key),
-                'total_solved': user.total_solved,
-            })
-        
+            usernames = _parse_username_list(request.GET.get('usernames', ''))[:_HISTORY_MAX_USERS]
+        if not usernames:
+            return JsonResponse({'error': 'No usernames provided. Use ?usernames=a,b'}, status=400)
+
+        fields = [f for f in request.GET.get('fields', '').split(',') if f in StatsSnapshot.FIELDS]
+        fields = fields or list(StatsSnapshot.FIELDS)
+        points = max(2, min(int(request.GET.get('points', 100)), _HISTORY_MAX_POINTS))
+
+        now = timezone.now()
+        if request.GET.get('since'):
+            since = datetime.fromtimestamp(int(request.GET['since']), tz=dt_timezone.utc)
+        else:
+            since = now - timedelta(days=max(1, min(int(request.GET.get('days', 30)), 3650)))
+        until = None
+        if request.GET.get('until'):
+            until = datetime.fromtimestamp(int(request.GET['until']), tz=dt_timezone.utc)
+
+        query = Q()
+        for name in usernames:
+            query |= Q(username__iexact=name)
+        users = {u.username.lower(): u for u in TrackedUser.objects.filter(query)}
+
+        results = []
+        for name in usernames:
+            user = users.get(name.lower())
+            if user is None:
+                results.append({'username': name, 'error': 'User is not tracked'})
+            else:
+                results.append(_history_series(user, since, until, points, fields))
+
+        if username:
+            if 'error' in results[0]:
+                return JsonResponse(results[0], status=404)
+            return JsonResponse(results[0])
+        return JsonResponse({'count': len(results), 'results': results})
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def api_user_contests(request, username):
+    """API endpoint for a user's stored contest rating curve and aggregates.
+
+    ?limit=N returns only the latest N contests. Served from the database;
+    nothing is fetched or reparsed from upstream.
+    """
+    try:
+        user = TrackedUser.objects.filter(username__iexact=username).first()
+        if user is None:
+            return JsonResponse({'error': f"User '{username}' is not tracked"}, status=404)
+
+        contests = user.contests.order_by('-start_time')
+        if request.GET.get('limit'):
+            contests = contests[:max(1, int(request.GET['limit']))]
+        contests = list(contests)[::-1]
+
         return JsonResponse({
-            'category': category,
-            'leaderboard': leaderboard
+            'username': user.username,
+            'contest_rating': user.contest_rating,
+            'best_rating': user.best_contest_rating,
+            'last_delta': user.last_rating_delta,
+            'percentile': user.contest_percentile,
+            'attended': user.contests_attended,
+            'history': [
+                {
+                    'title': c.title,
+                    'start_time': int(c.start_time.timestamp()),
+                    'rating': round(c.rating, 2),
+                    'delta': c.rating_delta,
+                    'ranking': c.ranking,
+                    'problems_solved': c.problems_solved,
+                    'total_problems': c.total_problems,
+                }
+                for c in contests
+            ],
         })
-    
+
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -945,10 +1615,7 @@ def api_leaderboard(request):
 def api_debug_raw(request, username):
     """Debug endpoint to see raw API response"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        raw_data = loop.run_until_complete(LeetCodeAPI.fetch_user_data(username))
-        loop.close()
+        raw_data = shared_client.run(LeetCodeAPI.fetch_user_data(username, use_cache=False))
 
         return JsonResponse(raw_data, json_dumps_params={'indent': 2})
     except Exception as e:
@@ -0,0 +1,122 @@
+"""
+Async-native versions of the tracker views that wait on upstream APIs.
+
+Used instead of the sync views in tracker/views.py when TRACKER_ASYNC_VIEWS
+is enabled, which is meant for ASGI deployments (see gunicorn.conf.py).
+Upstream waits then only hold a coroutine instead of a whole worker.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from .models import TrackedUser
+from .views import (
+    _cached_profile_stats,
+    _empty_profiles_context,
+    _fallback_users,
+    _gather_user_data,
+    _multi_request_usernames,
+    _multi_results,
+    _parse_username_list,
+    _profiles_context,
+    _stats_from_db_user,
+    get_user_data,
+)
+
+
+async def profile(request, username):
+    """Profile page view - Shows detailed user statistics"""
+    tracked_user, created = await TrackedUser.objects.aget_or_create(
+        username=username,
+        defaults={'display_name': username}
+    )
+
+    await sync_to_async(tracked_user.increment_views)()
+
+    if not created and getattr(settings, 'PROFILE_RENDER_FROM_DB', True):
+        return render(request, 'tracker/profile_professional.html', {
+            'username': username,
+            'initial_data_json': json.dumps(_cached_profile_stats(tracked_user), default=str),
+        })
+
+    try:
+        stats = await get_user_data(username)
+    except Exception as e:
+        stats = {"error": str(e), "username": username}
+
+    if isinstance(stats, dict) and stats.get('error'):
+        try:
+            db_user = await TrackedUser.objects.filter(username__iexact=username).afirst()
+        except Exception:
+            db_user = None
+
+        if db_user:
+            stats = _stats_from_db_user(db_user, fetch_error=stats.get('error'))
+
+    return render(request, 'tracker/profile_professional.html', {
+        'username': username,
+        'initial_data_json': json.dumps(stats, default=str),
+    })
+
+
+async def profiles(request):
+    """Render a page showing multiple profiles supplied via ?usernames=a,b,c"""
+    usernames = _parse_username_list(request.GET.get('usernames', '').strip())
+    if not usernames:
+        return render(request, 'tracker/home.html', _empty_profiles_context())
+
+    usernames = usernames[:50]
+
+    try:
+        results = await _gather_user_data(usernames)
+    except Exception as e:
+        results = [{'username': u, 'error': str(e)} for u in usernames]
+
+    fallback_users = await sync_to_async(_fallback_users)(usernames, results)
+    return render(request, 'tracker/home.html', _profiles_context(usernames, results, fallback_users))
+
+
+async def api_user_data(request, username):
+    """API endpoint to fetch user data.
+
+    ?refresh=1 bypasses the stats cache, ?refresh=force the raw response
+    cache as well.
+    """
+    try:
+        refresh = request.GET.get('refresh')
+        user_stats = await get_user_data(
+            username, force_refresh=refresh in ('1', 'true', 'force'), bypass_raw_cache=refresh == 'force'
+        )
+
+        if isinstance(user_stats, dict) and user_stats.get('error'):
+            try:
+                db_user = await TrackedUser.objects.filter(username__iexact=username).afirst()
+            except Exception:
+                db_user = None
+
+            if db_user:
+                return JsonResponse(_stats_from_db_user(db_user, fetch_error=user_stats.get('error')))
+
+        return JsonResponse(user_stats)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def api_user_data_multi(request):
+    """API endpoint to fetch multiple users' data concurrently (see views.api_user_data_multi)"""
+    try:
+        usernames = _multi_request_usernames(request)
+        if not usernames:
+            return JsonResponse({'error': 'No usernames provided. Use ?usernames=a,b or POST {"usernames": [...]}'}, status=400)
+
+        results = await _gather_user_data(usernames)
+        fallback_users = await sync_to_async(_fallback_users)(usernames, results)
+
+        out = _multi_results(usernames, results, fallback_users)
+        return JsonResponse({'count': len(out), 'results': out}, json_dumps_params={'indent': 2})
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
@@ -6,7 +6,8 @@ from urllib.parse import quote
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.db.models import Q
-from datetime import datetime, timedelta
+from datetime import datetime
+from .activity import calculate_streaks
 from .models import TrackedUser
 
 # ============= NORMALIZED API LAYER =============
@@ -181,51 +182,9 @@ def normalize_timestamp(ts) -> int or None:
             return None
 
 
-def calculate_streak(submission_calendar) -> tuple:
+def calculate_streak(submission_calendar, tz_offset: int = 0) -> tuple:
     """Calculate current and max streak from submission calendar."""
-    if not submission_calendar:
-        return 0, 0
-    
-    dates = []
-    for ts_str in submission_calendar.keys():
-        try:
-            t = int(ts_str)
-            if t > 10**12:
-                t = t // 1000
-            dates.append(datetime.fromtimestamp(t).date())
-        except Exception:
-            continue
-    
-    if not dates:
-        return 0, 0
-    
-    dates = sorted(set(dates))
-    today = datetime.now().date()
-    yesterday = today - timedelta(days=1)
-    
-    current_streak = 0
-    if today in dates or yesterday in dates:
-        current_date = today if today in dates else yesterday
-        current_streak = 1
-        for i in range(1, len(dates)):
-            prev_date = current_date - timedelta(days=1)
-            if prev_date in dates:
-                current_streak += 1
-                current_date = prev_date
-            else:
-                break
-    
-    max_streak = 0
-    temp_streak = 1
-    for i in range(1, len(dates)):
-        if (dates[i] - dates[i-1]).days == 1:
-            temp_streak += 1
-            max_streak = max(max_streak, temp_streak)
-        else:
-            temp_streak = 1
-    
-    max_streak = max(max_streak, temp_streak)
-    return current_streak, max_streak
+    return calculate_streaks(submission_calendar, tz_offset)
 
 
 def parse_user_stats(raw_data: dict) -> dict: